@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+AggregateKey = Tuple[str, Hashable, Hashable]
+"""
+(team, filter fingerprint, aggregate kind)
+"""
+
+
+class AggregateCache:
+    """
+    Bounded LRU of Ledger aggregates. Cached values are shared between callers and must be treated as read only.
+    Safe to use from several threads, values computed across a clear are dropped instead of stored.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        """
+        Number of aggregates kept, 0 disables caching.
+        """
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[AggregateKey, Any] = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: AggregateKey, compute: Callable[[], T]) -> T:
+        """
+        Returns the cached aggregate for key, computing and storing it on a miss.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+            self.misses += 1
+            generation = self._generation
+
+        value = compute()
+
+        with self._lock:
+            if generation == self._generation and self.max_size > 0:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+
+        return value
+
+    def clear(self) -> None:
+        """
+        Drops every aggregate, the hit and miss counters are kept.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self), "max_size": self.max_size}
@@ -0,0 +1,196 @@
+#! /usr/bin/env python
+"""
+Non-interactive entry point generating logs and charts for many teams and date windows from one parse of the export.
+
+Jobs come from a JSON job file:
+
+    python batch.py --job-file jobs.json
+
+    [
+        {"name": "x-phase-2", "teams": ["X"], "since": "2021-07-01", "until": "2021-09-30"},
+        {"name": "all-teams", "teams": ["X", "Y"], "since": "20210601", "charts": ["combined"], "log": false},
+        {"name": "sheets", "teams": ["X"], "charts": [], "log": false, "exports": ["csv", "npz"]}
+    ]
+
+or a single job from the command line:
+
+    python batch.py X Y --since 20210701 --style default --chart combined --chart over-time
+
+Teams are the flags in main.team_names or raid group names. Each job writes to
+Config.charts_dir/<name> and Config.logs_dir/<name>. Exports (see export.formats) are written to the
+logs dir as <team>-items.<format>, every dated item received in the window, and <team>-players.<format>.
+Items without a received_at timestamp fall outside every window and are left out.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+import export
+import main
+from config import Config
+from ledger import Ledger, LootQuery
+from store import to_ordinal
+from styles import Style
+
+
+@dataclass
+class BatchJob:
+    teams: List[str]
+    since: Optional[str] = None
+    """
+    Inclusive start date, YYYYMMDD or YYYY-MM-DD. None includes everything.
+    """
+    until: Optional[str] = None
+    """
+    Inclusive end date, same format as since. None runs up to the latest loot.
+    """
+    style: str = "default"
+    charts: Tuple[str, ...] = field(default_factory=lambda: tuple(Config.output_charts))
+    log: bool = True
+    exports: Tuple[str, ...] = ()
+    name: str = ""
+
+    def __post_init__(self) -> None:
+        for bound, date in (("since", self.since), ("until", self.until)):
+            try:
+                to_ordinal(date)  # fail on a malformed date before any output is written
+            except ValueError as error:
+                raise ValueError(f"{bound}: {error}") from None
+
+        if self.style not in Style.styles:
+            raise ValueError(f"Unknown style {self.style!r}, expected one of {tuple(Style.styles)}")
+
+        for chart in self.charts:
+            if chart not in Config.output_charts:
+                raise ValueError(f"Unknown chart {chart!r}, expected any of {Config.output_charts}")
+
+        for extension in self.exports:
+            if extension not in export.formats:
+                raise ValueError(f"Unknown export format {extension!r}, expected one of {export.formats}")
+
+        if not self.name:
+            self.name = "-".join([*self.teams, self.since or "start", self.until or "latest"])
+
+    @classmethod
+    def parse(cls, data: dict) -> BatchJob:
+        kwargs = {**data}
+        for key in ("charts", "exports"):
+            if key in kwargs:
+                kwargs[key] = tuple(kwargs[key])
+
+        return cls(**kwargs)
+
+
+def parse_args(args: List[str]) -> Tuple[List[BatchJob], int]:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("teams", nargs="*", help="team flags or raid group names for a single job")
+    parser.add_argument("--job-file", help="JSON list of jobs, replaces the single job arguments")
+    parser.add_argument("--since", help="inclusive start date, YYYYMMDD")
+    parser.add_argument("--until", help="inclusive end date, YYYYMMDD")
+    parser.add_argument("--style", default="default")
+    parser.add_argument("--chart", action="append", dest="charts", choices=Config.output_charts)
+    parser.add_argument("--no-log", action="store_false", dest="log")
+    parser.add_argument("--export", action="append", dest="exports", choices=export.formats, default=[])
+    parser.add_argument("--name", default="")
+    parser.add_argument("--render-jobs", type=int, default=Config.render_jobs, help="chart rendering processes")
+    options = parser.parse_args(args)
+
+    if options.job_file:
+        try:
+            with open(options.job_file) as job_file:
+                data = json.load(job_file)
+        except (OSError, ValueError) as error:
+            parser.error(f"cannot read --job-file {options.job_file}: {error}")
+
+        jobs = []
+        for number, job in enumerate(data, 1):
+            try:
+                jobs.append(BatchJob.parse(job))
+            except (TypeError, ValueError) as error:
+                parser.error(f"job {number} in {options.job_file}: {error}")
+
+        if not jobs:
+            parser.error(f"--job-file {options.job_file} holds no jobs")
+    elif options.teams:
+        try:
+            jobs = [
+                BatchJob(
+                    teams=options.teams,
+                    since=options.since,
+                    until=options.until,
+                    style=options.style,
+                    charts=tuple(options.charts or Config.output_charts),
+                    log=options.log,
+                    exports=tuple(options.exports),
+                    name=options.name,
+                )
+            ]
+        except ValueError as error:
+            parser.error(str(error))
+    else:
+        parser.error("pass teams or --job-file")
+
+    return jobs, options.render_jobs
+
+
+def run_job(guild: Ledger, job: BatchJob, charts_dir: str, logs_dir: str) -> None:
+    """
+    Points Config at the job's filters and output dirs, then writes its logs and charts.
+    """
+    Config.date_filter = job.since
+    Config.date_until = job.until
+    Config.style_choice = job.style
+    Config.excluded_charts = tuple(chart for chart in Config.output_charts if chart not in job.charts)
+    Config.charts_dir = os.path.join(charts_dir, job.name)
+    Config.logs_dir = os.path.join(logs_dir, job.name)
+
+    main.prep_charts_dir()
+    main.prep_logs_dir()
+    guild.assign_role_colors()
+
+    if job.log:
+        main.write_chart_log(guild, job.teams)
+
+    for extension in job.exports:
+        write_exports(guild, job, extension)
+
+    if Config.get_charts_to_render():
+        import render
+
+        render.render_charts(main.construct_chart_list(guild, job.teams), Config.render_jobs)
+
+
+def write_exports(guild: Ledger, job: BatchJob, extension: str) -> None:
+    for team in job.teams:
+        team_name = main.team_name(team)
+        window = LootQuery(team_name, since=job.since, until=job.until, excluded_instances=frozenset(), exclude=0)
+
+        export.write(export.item_records(guild, window), os.path.join(Config.logs_dir, f"{team_name}-items.{extension}"))
+        export.write(export.player_records(guild, team_name), os.path.join(Config.logs_dir, f"{team_name}-players.{extension}"))
+
+
+def run(jobs: List[BatchJob]) -> None:
+    """
+    Parses the export once and runs every job against the same Ledger.
+    """
+    charts_dir, logs_dir = Config.charts_dir, Config.logs_dir
+    Config.style_choice = jobs[0].style
+
+    history = main.get_history({main.team_name(team) for job in jobs for team in job.teams})
+    guild = Ledger(history)
+
+    for job in jobs:
+        print(f"{job.name}: {', '.join(main.team_name(team) for team in job.teams)}")
+        run_job(guild, job, charts_dir, logs_dir)
+
+    print("aggregate cache: " + ", ".join(f"{name} {value}" for name, value in guild.aggregates.stats.items()))
+
+
+if __name__ == "__main__":
+    batch_jobs, Config.render_jobs = parse_args(sys.argv[1:])
+    run(batch_jobs)
@@ -0,0 +1,176 @@
+"""
+Times the Ledger pipeline on synthetic histories, offline and without matplotlib.
+
+    python -m benchmarks.bench_ledger --sizes 100 1000 10000 100000 --output ledger-bench.json
+
+Each stage is run --repeat times per size and the timings recorded as JSON, compare two result files to see
+how a change scales. The run ends with the per item cost of every stage at the largest size relative to the
+smallest, a stage whose ratio grows with the sizes is worse than linear.
+The generated history is held in memory, 100000 players at the default 40 items per player need several GB.
+"""
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import platform
+import statistics
+import subprocess
+import time
+from dataclasses import dataclass, asdict, field
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from benchmarks.synthetic import HistorySpec, generate
+from config import Config
+from ledger import HistoryData, Ledger
+
+default_sizes = (100, 1000, 10000, 100000)
+
+
+@dataclass
+class StageResult:
+    stage: str
+    players: int
+    items: int
+    seconds: List[float]
+    min: float = 0.0
+    median: float = 0.0
+
+    def __post_init__(self) -> None:
+        self.min = min(self.seconds)
+        self.median = statistics.median(self.seconds)
+
+
+@dataclass
+class BenchmarkRun:
+    results: List[StageResult] = field(default_factory=list)
+    meta: Dict[str, object] = field(default_factory=dict)
+
+    def to_json(self) -> dict:
+        return {"meta": self.meta, "results": [asdict(result) for result in self.results]}
+
+
+def timed(function: Callable[[], object], repeat: int, setup: Optional[Callable[[], object]] = None) -> List[float]:
+    """
+    Wall clock seconds of each call, setup runs untimed before every call.
+    """
+    seconds = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        seconds.append(time.perf_counter() - start)
+    return seconds
+
+
+def bench_size(players: int, repeat: int, spec: HistorySpec) -> List[StageResult]:
+    """
+    Times every stage for one history size. Aggregates are timed cold, the Ledger's index and aggregate cache
+    are dropped before each call.
+    """
+    spec = HistorySpec(**{**asdict(spec), "players": players})
+    data = [*generate(spec)]
+    items = sum(len(player["received"]) for player in data)
+
+    history = HistoryData.parse(data)
+    ledger = Ledger(history)
+    teams = [*ledger.teams]
+    datasets = {team: ledger.get_main_spec_dataset(team) for team in teams}
+
+    stages = {
+        "HistoryData.parse": (lambda: HistoryData.parse(data), None),
+        "Ledger.split_teams": (ledger.split_teams, None),
+        "Ledger.get_main_spec_dataset": (
+            lambda: [ledger.get_main_spec_dataset(team) for team in teams], ledger.invalidate,
+        ),
+        "Ledger.loot_over_time": (lambda: [ledger.loot_over_time(team) for team in teams], ledger.invalidate),
+        "Ledger.sequence_role_colors": (
+            lambda: [ledger.sequence_role_colors(datasets[team], team) for team in teams], None,
+        ),
+        "Player.received": (
+            lambda: [player.received for player in history.players],
+            lambda: [player.release(history.items) for player in history.players],
+        ),
+    }
+
+    return [
+        StageResult(stage=stage, players=players, items=items, seconds=timed(function, repeat, setup))
+        for stage, (function, setup) in stages.items()
+    ]
+
+
+def scaling(results: List[StageResult]) -> Dict[str, float]:
+    """
+    Median seconds per item of every stage at the largest size over the smallest. Close to 1 for stages linear
+    in the item count, growing with the size ratio for quadratic ones.
+    """
+    stages: Dict[str, List[StageResult]] = {}
+    for result in results:
+        stages.setdefault(result.stage, []).append(result)
+
+    ratios = {}
+    for stage, sized in stages.items():
+        smallest, largest = min(sized, key=lambda result: result.items), max(sized, key=lambda result: result.items)
+        if smallest.items and largest.items > smallest.items and smallest.median:
+            ratios[stage] = (largest.median / largest.items) / (smallest.median / smallest.items)
+    return ratios
+
+
+def metadata(spec: HistorySpec) -> Dict[str, object]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+
+    return {
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "date_filter": Config.date_filter,
+        "spec": {**asdict(spec), "players": None},
+    }
+
+
+def run(sizes: List[int], repeat: int, spec: HistorySpec) -> BenchmarkRun:
+    benchmark = BenchmarkRun(meta=metadata(spec))
+    for players in sizes:
+        for result in bench_size(players, repeat, spec):
+            benchmark.results.append(result)
+            print(f"{result.players:>7} players {result.stage:<30} min {result.min:.4f}s median {result.median:.4f}s")
+
+    benchmark.meta["scaling"] = scaling(benchmark.results)
+    for stage, ratio in benchmark.meta["scaling"].items():
+        print(f"{stage:<30} per item cost x{ratio:.2f} from {min(sizes)} to {max(sizes)} players")
+
+    return benchmark
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=default_sizes, help="player counts to benchmark")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--items-per-player", type=int, default=HistorySpec.items_per_player)
+    parser.add_argument("--since", help="Config.date_filter used by the aggregates, YYYYMMDD")
+    parser.add_argument("--seed", type=int, default=HistorySpec.seed)
+    parser.add_argument("--output", help="JSON results file")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    options = parse_args()
+    Config.style_choice = "default"
+    Config.date_filter = options.since
+
+    benchmark_run = run(
+        options.sizes,
+        options.repeat,
+        HistorySpec(items_per_player=options.items_per_player, seed=options.seed),
+    )
+    if options.output:
+        with open(options.output, "w") as output:
+            json.dump(benchmark_run.to_json(), output, indent=2)
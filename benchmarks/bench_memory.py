@@ -0,0 +1,121 @@
+"""
+Reports the memory held by a parsed history and the Ledger built from it.
+
+    python -m benchmarks.bench_memory history/character-json.json
+    python -m benchmarks.bench_memory --players 3000 --output memory.json
+
+Without a path a synthetic export of --players players is written to a temporary file first.
+Sizes are measured with tracemalloc, so they cover Python objects and numpy arrays but not memory mapped files.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import tempfile
+import tracemalloc
+from dataclasses import dataclass, asdict, field
+from typing import Dict, List, Optional
+
+from benchmarks.synthetic import HistorySpec, write
+from config import Config
+from ingest import iter_players
+from ledger import HistoryData, Ledger
+
+top_sites = 10
+
+
+@dataclass
+class MemoryReport:
+    path: str
+    file_bytes: int
+    players: int = 0
+    items: int = 0
+    parse_peak: int = 0
+    """
+    Highest traced bytes while streaming and parsing the export
+    """
+    history: int = 0
+    """
+    Bytes still held by the parsed HistoryData
+    """
+    ledger: int = 0
+    """
+    Bytes held once the Ledger is built and every team's listing computed
+    """
+    sites: List[str] = field(default_factory=list)
+    """
+    Allocation sites holding the most memory at the end
+    """
+
+    @property
+    def bytes_per_item(self) -> float:
+        return self.ledger / self.items if self.items else 0.0
+
+    def to_json(self) -> Dict[str, object]:
+        return {**asdict(self), "bytes_per_item": self.bytes_per_item}
+
+
+def measure(path: str) -> MemoryReport:
+    report = MemoryReport(path=path, file_bytes=os.path.getsize(path))
+
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+
+    history = HistoryData.parse(iter_players(path))
+    gc.collect()
+    report.history, report.parse_peak = (size - baseline for size in tracemalloc.get_traced_memory())
+
+    ledger = Ledger(history)
+    for team in ledger.teams:
+        ledger.loot_listing(team)
+    gc.collect()
+    report.ledger = tracemalloc.get_traced_memory()[0] - baseline
+
+    report.players, report.items = len(history.players), len(history.items)
+    report.sites = [str(statistic) for statistic in tracemalloc.take_snapshot().statistics("lineno")[:top_sites]]
+    tracemalloc.stop()
+    return report
+
+
+def print_report(report: MemoryReport) -> None:
+    mib = 1024 * 1024
+    print(f"{report.path}: {report.file_bytes / mib:.1f} MiB, {report.players} players, {report.items} items")
+    print(f"  parse peak       {report.parse_peak / mib:8.1f} MiB")
+    print(f"  parsed history   {report.history / mib:8.1f} MiB")
+    print(f"  ledger           {report.ledger / mib:8.1f} MiB, {report.bytes_per_item:.0f} bytes per item")
+    print("  largest allocation sites:")
+    for site in report.sites:
+        print(f"    {site}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", nargs="?", help="character-json export, a synthetic one is generated when omitted")
+    parser.add_argument("--players", type=int, default=3000)
+    parser.add_argument("--seed", type=int, default=HistorySpec.seed)
+    parser.add_argument("--output", help="JSON report file")
+    return parser.parse_args()
+
+
+def main(path: Optional[str], players: int, seed: int) -> MemoryReport:
+    if path:
+        return measure(path)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "character-json.json")
+        write(HistorySpec(players=players, seed=seed), path)
+        return measure(path)
+
+
+if __name__ == "__main__":
+    options = parse_args()
+    Config.style_choice = "default"
+
+    memory_report = main(options.path, options.players, options.seed)
+    print_report(memory_report)
+    if options.output:
+        with open(options.output, "w") as output:
+            json.dump(memory_report.to_json(), output, indent=2)
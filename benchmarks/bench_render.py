@@ -0,0 +1,165 @@
+"""
+Times every chart type on synthetic teams of increasing size, rendering with Agg into a temporary dir.
+
+    python -m benchmarks.bench_render --sizes 10 40 160 --output render-bench.json
+
+Each output is split into figure construction, rasterization (savefig into memory) and the disk write,
+and its PNG size recorded.
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import tempfile
+import time
+from dataclasses import dataclass, asdict, field
+from typing import Dict, List
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+
+import plots
+from benchmarks.bench_ledger import metadata
+from benchmarks.synthetic import HistorySpec, generate
+from config import Config
+from ledger import Ledger
+
+default_sizes = (10, 40, 160)
+"""
+Players per team
+"""
+
+chart_types = ("BarChart", "PieChart", "Histogram", "CombinedPieBar", "LootOverTime")
+
+
+@dataclass
+class RenderStats:
+    chart: str
+    players: int
+    outputs: int = 0
+    construct: float = 0.0
+    """
+    Seconds building and updating figures
+    """
+    rasterize: float = 0.0
+    """
+    Seconds drawing and PNG encoding into memory
+    """
+    write: float = 0.0
+    """
+    Seconds writing the encoded PNGs to disk
+    """
+    bytes: int = 0
+
+    @property
+    def seconds(self) -> float:
+        return self.construct + self.rasterize + self.write
+
+    def to_json(self) -> dict:
+        charts_per_second = self.outputs / self.seconds if self.seconds else 0.0
+        return {**asdict(self), "seconds": self.seconds, "charts_per_second": charts_per_second}
+
+
+@dataclass
+class RenderRun:
+    results: List[RenderStats] = field(default_factory=list)
+    meta: Dict[str, object] = field(default_factory=dict)
+
+    def to_json(self) -> dict:
+        return {"meta": self.meta, "results": [result.to_json() for result in self.results]}
+
+
+def build_charts(players: int, spec: HistorySpec) -> List[plots.Chart]:
+    """
+    One chart of every type for a synthetic single team of the given size.
+    """
+    spec = HistorySpec(**{**asdict(spec), "players": players, "teams": ("Benchmark",)})
+    ledger = Ledger(generate(spec))
+
+    dataset = ledger.get_main_spec_dataset("Benchmark")
+    colors = ledger.sequence_role_colors(dataset, "Benchmark")
+    charts = {
+        "BarChart": plots.BarChart(dataset, colors),
+        "PieChart": plots.PieChart(dataset, colors),
+        "Histogram": plots.Histogram(dataset),
+        "CombinedPieBar": plots.CombinedPieBar(dataset, colors),
+        "LootOverTime": plots.LootOverTime(ledger.loot_timeline("Benchmark")),
+    }
+    for chart in charts.values():
+        chart.team_id = "Benchmark"
+        if isinstance(chart, plots.LootOverTime):
+            chart.show_progress = False
+
+    return [charts[name] for name in chart_types]
+
+
+def bench_chart(chart: plots.Chart, players: int) -> RenderStats:
+    stats = RenderStats(chart=type(chart).__name__, players=players)
+    figures = chart.figures()
+
+    while True:
+        start = time.perf_counter()
+        try:
+            path, figure = next(figures)
+        except StopIteration:
+            break
+        built = time.perf_counter()
+
+        buffer = io.BytesIO()
+        figure.savefig(buffer, format="png")
+        rasterized = time.perf_counter()
+
+        with open(path, "wb") as output:
+            output.write(buffer.getbuffer())
+        written = time.perf_counter()
+
+        stats.outputs += 1
+        stats.construct += built - start
+        stats.rasterize += rasterized - built
+        stats.write += written - rasterized
+        stats.bytes += buffer.getbuffer().nbytes
+
+    plt.close("all")
+    return stats
+
+
+def run(sizes: List[int], spec: HistorySpec) -> RenderRun:
+    benchmark = RenderRun(meta={**metadata(spec), "backend": matplotlib.get_backend(), "style": Config.style_choice})
+
+    with tempfile.TemporaryDirectory() as charts_dir:
+        Config.charts_dir = charts_dir
+        for players in sizes:
+            for chart in build_charts(players, spec):
+                stats = bench_chart(chart, players)
+                benchmark.results.append(stats)
+                print(
+                    f"{players:>5} players {stats.chart:<15} {stats.outputs:>4} outputs "
+                    f"construct {stats.construct:.3f}s rasterize {stats.rasterize:.3f}s write {stats.write:.3f}s "
+                    f"{stats.bytes / 1024:.0f} KiB"
+                )
+
+    return benchmark
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=default_sizes, help="players per team")
+    parser.add_argument("--style", default="default")
+    parser.add_argument("--seed", type=int, default=HistorySpec.seed)
+    parser.add_argument("--output", help="JSON results file")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    options = parse_args()
+    Config.style_choice = options.style
+    Config.chart_cache = False
+
+    render_run = run(options.sizes, HistorySpec(seed=options.seed))
+    if options.output:
+        with open(options.output, "w") as output:
+            json.dump(render_run.to_json(), output, indent=2)
@@ -0,0 +1,164 @@
+"""
+Deterministic ThatsMyBis shaped character-json exports for benchmarks and manual testing.
+
+    python -m benchmarks.synthetic history/character-json.json --players 1000 --seed 1
+
+The same HistorySpec always produces the same export.
+"""
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import random
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, Sequence
+
+default_note_mix = {
+    "": 20,
+    "Mainspec BIS": 15,
+    "Best in Slot": 5,
+    "Upgrade": 25,
+    "Minor Upgrade": 10,
+    "Banking": 5,
+    "PvP": 3,
+    "OS": 7,
+    "OSPvP": 2,
+    "Pass": 3,
+    "Other": 5,
+}
+"""
+officer_note -> relative weight, "" for items without a note
+"""
+
+item_names = (
+    "Helm of the Fallen Champion", "Pauldrons of the Fallen Defender", "Chestguard of the Fallen Hero",
+    "Gloves of the Fallen Champion", "Leggings of the Fallen Defender", "Ring of Cryptic Dreams",
+    "Band of the Eternal Champion", "Cloak of the Pit Stalker", "Boots of Utter Darkness", "Vestments of the Sea-Witch",
+    "Pattern: Belt of Blasting", "Plans: Red Belt of Battle", "Formula: Enchant Weapon - Major Spellpower",
+    "Verdant Sphere", "Magtheridon's Head", "Tier 5 Token",
+)
+
+classes = {
+    "Warrior": "tank", "Paladin": "healer", "Hunter": "ranged", "Rogue": "melee", "Priest": "healer",
+    "Shaman": "healer", "Mage": "ranged", "Warlock": "ranged", "Druid": "tank",
+}
+
+
+@dataclass
+class HistorySpec:
+    players: int = 100
+    teams: Sequence[str] = ("Team X - Rainbow", "Team Y - nicorn")
+    items_per_player: int = 40
+    """
+    Mean items received per player, each player receives between 0 and twice as many.
+    """
+    start: str = "2021-06-01"
+    days: int = 365
+    """
+    Date span of the loot, starting at start.
+    """
+    raid_days: Sequence[int] = (2, 3)
+    """
+    Weekdays raided on, Monday is 0. Every dated item falls on one of them.
+    """
+    instances: Sequence[int] = (10, 11, 12, 14)
+    note_mix: Dict[str, float] = field(default_factory=lambda: {**default_note_mix})
+    offspec: float = 0.1
+    """
+    Share of items flagged is_offspec.
+    """
+    undated: float = 0.01
+    """
+    Share of items without a received_at timestamp.
+    """
+    seed: int = 0
+
+
+def raid_dates(spec: HistorySpec) -> Sequence[datetime.date]:
+    start = datetime.date.fromisoformat(spec.start)
+    dates = [start + datetime.timedelta(days=day) for day in range(spec.days)]
+    return [date for date in dates if date.weekday() in spec.raid_days] or [start]
+
+
+def generate(spec: HistorySpec) -> Iterator[dict]:
+    """
+    Yields the players of the export one at a time.
+    """
+    rng = random.Random(spec.seed)
+    dates = raid_dates(spec)
+    notes, weights = [*spec.note_mix.keys()], [*spec.note_mix.values()]
+    class_names = [*classes.keys()]
+
+    for index in range(spec.players):
+        received = []
+        for _ in range(rng.randint(0, 2 * spec.items_per_player)):
+            name = rng.choice(item_names)
+            date = rng.choice(dates)
+            received_at = f"{date.isoformat()} {rng.randint(19, 23):02}:{rng.randint(0, 59):02}:{rng.randint(0, 59):02}"
+            if rng.random() < spec.undated:
+                received_at = None
+
+            received.append({
+                "item_id": 30000 + item_names.index(name),
+                "name": name,
+                "instance_id": rng.choice(spec.instances),
+                "quality": 4,
+                "pivot": {
+                    "is_offspec": rng.random() < spec.offspec,
+                    "officer_note": rng.choices(notes, weights)[0] or None,
+                    "received_at": received_at,
+                },
+            })
+
+        player_class = rng.choice(class_names)
+        yield {
+            "id": 1000 + index,
+            "name": f"Player{index}",
+            "raid_group_name": spec.teams[index % len(spec.teams)],
+            "class": player_class,
+            "spec": classes[player_class],
+            "received": received,
+            "prios": [],
+            "wishlist": [],
+        }
+
+
+def write(spec: HistorySpec, path: str) -> None:
+    """
+    Writes the export to path, one player at a time.
+    """
+    with open(path, "w") as export:
+        export.write("[")
+        for index, player in enumerate(generate(spec)):
+            export.write(",\n" if index else "\n")
+            json.dump(player, export)
+        export.write("\n]\n")
+
+
+def parse_args() -> argparse.Namespace:
+    defaults = HistorySpec()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path")
+    parser.add_argument("--players", type=int, default=defaults.players)
+    parser.add_argument("--team", action="append", dest="teams", help="raid group name, repeat for several teams")
+    parser.add_argument("--items-per-player", type=int, default=defaults.items_per_player)
+    parser.add_argument("--start", default=defaults.start, help="first raid date, YYYY-MM-DD")
+    parser.add_argument("--days", type=int, default=defaults.days)
+    parser.add_argument("--note-mix", type=json.loads, help='JSON object of officer_note -> weight, e.g. {"Upgrade": 3, "": 1}')
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    options = parse_args()
+    history_spec = HistorySpec(
+        players=options.players,
+        teams=options.teams or HistorySpec.teams,
+        items_per_player=options.items_per_player,
+        start=options.start,
+        days=options.days,
+        note_mix=options.note_mix or {**default_note_mix},
+        seed=options.seed,
+    )
+    write(history_spec, options.path)
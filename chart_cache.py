@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import json
+import os
+from typing import Dict, Iterable, List
+
+import plots
+
+
+class ChartCache:
+    """
+    Manifest of the input digest every chart in charts_dir was rendered from.
+    Charts whose digest matches an existing file are skipped instead of re-rendered.
+    """
+    file_name = ".chart-manifest.json"
+
+    def __init__(self, charts_dir: str) -> None:
+        self.path = os.path.join(charts_dir, self.file_name)
+        self.entries: Dict[str, str] = {}
+        """
+        output file name -> input digest
+        """
+        try:
+            with open(self.path) as manifest:
+                self.entries = json.load(manifest)
+        except (OSError, ValueError):
+            pass
+
+    def is_current(self, path: str, key: str) -> bool:
+        return self.entries.get(os.path.basename(path)) == key and os.path.exists(path)
+
+    def stale(self, charts: Iterable[plots.Chart]) -> List[plots.Chart]:
+        """
+        Narrows each chart to the outputs that are missing or were rendered from different inputs.
+        """
+        stale = []
+        for chart in charts:
+            changed = {path for path, key in chart.outputs().items() if not self.is_current(path, key)}
+            chart = chart.select(changed) if changed else None
+            if chart is not None:
+                stale.append(chart)
+
+        return stale
+
+    def record(self, charts: Iterable[plots.Chart]) -> None:
+        for chart in charts:
+            self.entries.update({os.path.basename(path): key for path, key in chart.outputs().items()})
+
+    def save(self) -> None:
+        with open(self.path, "w") as manifest:
+            json.dump(self.entries, manifest, indent=2, sort_keys=True)
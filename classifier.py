@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import enum
+import functools
+import re
+import sys
+from typing import Dict, Optional, Tuple
+
+
+class ItemFlag(enum.IntFlag):
+    """
+    Classification bits stored on each ReceivedItem and in the ItemStore flags column.
+    """
+    MAINSPEC = 1
+    UPGRADE = 2
+    BANKED = 4
+    PVP = 8
+    OTHER = 16
+    PATTERN_OR_PLAN = 32
+    EXCLUDED = 64
+    OFFSPEC = 128
+
+
+class TermMatcher:
+    """
+    Finds every configured term occurring in a string with a single compiled regex.
+    Results are cached per distinct string, so each officer note or item name is scanned once.
+    """
+
+    def __init__(self, terms: Dict[str, int]) -> None:
+        self._pattern: Optional[re.Pattern] = None
+        if terms:
+            # Longest first, so at any position the longest term starting there is the one captured.
+            alternatives = "|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True))
+            self._pattern = re.compile(f"(?=({alternatives}))")
+
+        # A captured term also implies every shorter term it contains, which the regex could not capture
+        # at the same position.
+        self._term_flags = {
+            term: functools.reduce(lambda a, b: a | b, [flags for other, flags in terms.items() if other in term], 0)
+            for term in terms
+        }
+        self._cache: Dict[str, int] = {}
+
+    def __call__(self, text: str) -> int:
+        try:
+            return self._cache[text]
+        except KeyError:
+            pass
+
+        flags = 0
+        if self._pattern is not None:
+            for match in self._pattern.finditer(text):
+                flags |= self._term_flags[match.group(1)]
+
+        self._cache[sys.intern(text)] = flags
+        return flags
+
+
+class Classifier:
+    """
+    Compiles the officer note and item name terms used to classify received items.
+    Officer notes containing any Config.excluded_officer_note term are flagged EXCLUDED.
+    """
+
+    note_terms = {
+        "Mainspec BIS": ItemFlag.MAINSPEC,
+        "Best in Slot": ItemFlag.MAINSPEC,
+        "Upgrade": ItemFlag.UPGRADE,
+        "Banking": ItemFlag.BANKED,
+        "PvP": ItemFlag.PVP,
+        "OSPvP": ItemFlag.PVP,
+        "Other": ItemFlag.OTHER,
+    }
+
+    name_terms = {
+        "Pattern": ItemFlag.PATTERN_OR_PLAN,
+        "Plan": ItemFlag.PATTERN_OR_PLAN,
+    }
+
+    def __init__(self, excluded_officer_note: Tuple[str, ...]) -> None:
+        note_terms = {term: int(flag) for term, flag in self.note_terms.items()}
+        for term in excluded_officer_note:
+            note_terms[term] = note_terms.get(term, 0) | ItemFlag.EXCLUDED
+
+        self.excluded_officer_note = excluded_officer_note
+        self._notes = TermMatcher(note_terms)
+        self._names = TermMatcher({term: int(flag) for term, flag in self.name_terms.items()})
+
+    def classify(self, officer_note: str, item_name: str, is_offspec: bool) -> int:
+        flags = self._notes(officer_note) | self._names(item_name)
+        if is_offspec:
+            flags |= ItemFlag.OFFSPEC
+
+        return flags
+
+
+@functools.lru_cache(maxsize=None)
+def get_classifier(excluded_officer_note: Tuple[str, ...]) -> Classifier:
+    """
+    Returns the compiled classifier for a set of exclusion terms, compiling it on first use.
+    """
+    return Classifier(excluded_officer_note)
@@ -1,4 +1,4 @@
-from typing import Optional, Set
+from typing import Optional, Set, Tuple
 
 
 class Config:
@@ -12,6 +12,12 @@ class Config:
     format: 0915 (MMDD)
     """
 
+    date_until: Optional[str] = None
+    """
+    date_until is an optional inclusive upper bound on item received dates, same format as date_filter.
+    None includes everything received after date_filter.
+    """
+
     style_choice: Optional[str] = None
     """
     style_choice is a user supplied string used to select a visual style for charts.
@@ -34,6 +40,29 @@ class Config:
     Source dir for raw data to be visualised
     """
 
+    cache_dir: Optional[str] = "./cache"
+    """
+    Destination for the parsed ledger snapshot, reused until the export or excluded_officer_note changes.
+    Set to None to parse the export on every run.
+    """
+
+    render_jobs: int = 1
+    """
+    Number of worker processes used to render charts. 1 renders serially in the main process.
+    """
+
+    chart_cache: bool = True
+    """
+    Skip re-rendering charts whose data, colors and style are unchanged since the last run.
+    Digests are kept in a manifest in charts_dir.
+    """
+
+    aggregate_cache_size: int = 64
+    """
+    Number of aggregates (datasets, timelines, totals) each Ledger keeps, least recently used first out.
+    0 disables the cache.
+    """
+
     output_charts = ("bar", "pie", "hist", "combined", "over-time")
     """
     Available chart types
@@ -48,8 +77,29 @@ class Config:
     """
     Add any term in the "officer_note" field of received items that is not associated to a mainspec upgrade.
     ie. terms associated to any gear you do not wish to include in a chart.
+    Items are classified when the export is parsed, set this before building a Ledger.
+    """
+
+    log_only: bool = False
+    """
+    Only display and save the loot log, no charts are rendered and matplotlib is never imported.
+    Enabled by passing --log-only on the command line.
+    """
+
+    profile: bool = False
+    """
+    Record timing spans around each pipeline stage and chart save, written to logs_dir/profile-report.json.
+    Enabled by passing --profile on the command line.
+    """
+
+    profile_tools: Tuple[str, ...] = ()
+    """
+    Profilers wrapped around a profiled run, any of instrument.tools. Pass --profile=cprofile,tracemalloc.
     """
 
     @classmethod
     def get_charts_to_render(cls) -> Set[str]:
+        if cls.log_only:
+            return set()
+
         return {*cls.output_charts} - {*cls.excluded_charts}
\ No newline at end of file
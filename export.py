@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import csv
+import json
+import os
+from typing import Dict, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+from ledger import Ledger, LootQuery
+
+Columns = Dict[str, Union[np.ndarray, Sequence]]
+"""
+column name -> values, every column the same length. Table.columns can be written as is.
+"""
+
+formats = ("csv", "jsonl", "npz")
+"""
+File extensions understood by write
+"""
+
+chunk_rows = 1 << 16
+"""
+Rows converted to Python values and written at a time
+"""
+
+buffer_size = 1 << 20
+
+
+def item_records(ledger: Ledger, query: Optional[LootQuery] = None) -> Columns:
+    """
+    One row per received item, ordered by player then date, selected by query or every item when None.
+    Queries only select dated items, every item includes undated ones with an empty received_at.
+    flags holds the ItemFlag bits of the item.
+    """
+    items = ledger.history.items
+    players = ledger.history.players
+    rows = np.arange(len(items)) if query is None else ledger.query_rows(query)
+    rows = rows[np.lexsort((items.received[rows], items.player[rows]))]
+
+    owner = items.player[rows]
+    return {
+        "player_id": np.array([player.id for player in players], dtype=np.int64)[owner],
+        "player_name": np.array([player.name for player in players], dtype=object)[owner],
+        "team": np.array([player.raid_group_name for player in players], dtype=object)[owner],
+        "item_id": items.item_id[rows],
+        "item_name": np.array(items.names, dtype=object)[items.name[rows]],
+        "instance_id": items.instance_id[rows],
+        "received_at": np.array(items.timestamps, dtype=object)[items.timestamp[rows]],
+        "officer_note": np.array(items.notes, dtype=object)[items.note[rows]],
+        "flags": items.flags[rows],
+    }
+
+
+def player_records(ledger: Ledger, team_name: str, query: Optional[LootQuery] = None) -> Columns:
+    """
+    One row per team member in team order: every item received and the mainspec items counted by query,
+    LootQuery.from_config when None.
+    """
+    members = ledger.teams[team_name]
+    received = ledger.loot_allocation_all[team_name]
+    main_spec = dict(ledger.query(query or LootQuery.from_config(team_name)))
+
+    return {
+        "player_id": [player.id for player in members],
+        "player_name": [player.name for player in members],
+        "role": [player.role for player in members],
+        "received": [received[player.name] for player in members],
+        "main_spec": [main_spec[player.name] for player in members],
+    }
+
+
+def _chunks(columns: Columns) -> Iterator[List[tuple]]:
+    """
+    Yields rows chunk_rows at a time, each column slice is converted to Python values in one call.
+    """
+    values = [*columns.values()]
+    length = len(values[0]) if values else 0
+    for start in range(0, length, chunk_rows):
+        yield [*zip(*(_to_list(column[start:start + chunk_rows]) for column in values))]
+
+
+def _to_list(values: Union[np.ndarray, Sequence]) -> list:
+    return values.tolist() if isinstance(values, np.ndarray) else [*values]
+
+
+def write_csv(columns: Columns, path: str) -> None:
+    with open(path, "w", newline="", encoding="utf-8", buffering=buffer_size) as export:
+        writer = csv.writer(export)
+        writer.writerow(columns.keys())
+        for rows in _chunks(columns):
+            writer.writerows(rows)
+
+
+def write_jsonl(columns: Columns, path: str) -> None:
+    """
+    One JSON object per row, keyed by column name.
+    """
+    encode = json.JSONEncoder(ensure_ascii=False).encode
+    names = [*columns.keys()]
+    with open(path, "w", encoding="utf-8", buffering=buffer_size) as export:
+        for rows in _chunks(columns):
+            export.write("".join([encode(dict(zip(names, row))) + "\n" for row in rows]))
+
+
+def write_npz(columns: Columns, path: str) -> None:
+    """
+    One array per column in an uncompressed .npz, loaded with numpy.load(path) without pickling.
+    String columns are dictionary encoded: <name> holds codes into the unique values held in <name>.values,
+    decode with archive[f"{name}.values"][archive[name]].
+    """
+    arrays = {}
+    for name, values in columns.items():
+        array = np.asarray(values)
+        if array.dtype == object or array.dtype.kind == "U":
+            pool, codes = np.unique(array.astype(str), return_inverse=True)
+            arrays[name], arrays[f"{name}.values"] = codes.astype(np.int32), pool
+        else:
+            arrays[name] = array
+
+    with open(path, "wb", buffering=buffer_size) as export:
+        np.savez(export, **arrays)
+
+
+def write(columns: Columns, path: str) -> None:
+    """
+    Writes columns in the format given by the extension of path, one of formats.
+    """
+    extension = os.path.splitext(path)[1].lstrip(".")
+    writers = {"csv": write_csv, "jsonl": write_jsonl, "npz": write_npz}
+    if extension not in writers:
+        raise ValueError(f"Unknown export format {extension!r}, expected one of {formats}")
+
+    writers[extension](columns, path)
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Collection, Iterator, Optional, TextIO
+
+_non_space = re.compile(r"\S")
+_delimiters = " \t\n\r,]"
+
+
+class ArrayStream:
+    """
+    Incrementally decodes the elements of a top level JSON array from a text file.
+    Only the unread part of the current chunk and the element being decoded are held in memory.
+    """
+
+    def __init__(self, fp: TextIO, chunk_size: int = 1 << 16) -> None:
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._position = 0
+        self._eof = False
+
+    def __iter__(self) -> Iterator[Any]:
+        self._expect("[")
+        if self._next_token() == "]":
+            return
+
+        while True:
+            yield self._decode()
+            if self._expect(",]") == "]":
+                return
+
+    def _read(self) -> bool:
+        """
+        Drops the consumed part of the buffer and appends the next chunk. Returns False at end of file.
+        """
+        if self._eof:
+            return False
+
+        chunk = self._fp.read(self._chunk_size)
+        self._buffer = self._buffer[self._position:] + chunk
+        self._position = 0
+        self._eof = not chunk
+        return not self._eof
+
+    def _next_token(self) -> str:
+        """
+        Skips whitespace and returns the next character without consuming it, or "" at end of file.
+        """
+        while True:
+            match = _non_space.search(self._buffer, self._position)
+            if match:
+                self._position = match.start()
+                return self._buffer[self._position]
+
+            self._position = len(self._buffer)
+            if not self._read():
+                return ""
+
+    def _expect(self, tokens: str) -> str:
+        token = self._next_token()
+        if not token or token not in tokens:
+            raise ValueError(f"Malformed JSON array, expected one of {tokens!r} but found {token or 'end of file'!r}")
+
+        self._position += 1
+        return token
+
+    def _decode(self) -> Any:
+        self._next_token()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError:
+                if not self._read():
+                    raise
+                continue
+
+            # A number cut off at the chunk boundary still decodes, so read on until a delimiter follows it.
+            if (end == len(self._buffer) or self._buffer[end] not in _delimiters) and self._read():
+                continue
+
+            self._position = end
+            return value
+
+
+def trim_item(data: dict) -> dict:
+    """
+    Keeps only the received item fields read by ReceivedItem.parse
+    """
+    pivot = data["pivot"]
+    return {
+        "item_id": data["item_id"],
+        "name": data["name"],
+        "instance_id": data["instance_id"],
+        "pivot": {
+            "is_offspec": pivot["is_offspec"],
+            "officer_note": pivot["officer_note"],
+            "received_at": pivot["received_at"],
+        },
+    }
+
+
+def trim_player(data: dict) -> dict:
+    """
+    Keeps only the player fields read by Player.parse
+    """
+    return {
+        "id": data["id"],
+        "name": data["name"],
+        "raid_group_name": data["raid_group_name"],
+        "class": data["class"],
+        "received": [trim_item(item) for item in data["received"]],
+    }
+
+
+def iter_players(path: str, teams: Optional[Collection[str]] = None, chunk_size: int = 1 << 16) -> Iterator[dict]:
+    """
+    Streams the players of a ThatsMyBis character-json export one at a time.
+    Players outside the requested teams are dropped as they are read, pass teams=None to keep every team.
+    """
+    with open(path) as export:
+        for player in ArrayStream(export, chunk_size):
+            if teams is None or player["raid_group_name"] in teams:
+                yield trim_player(player)
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import contextlib
+import cProfile
+import json
+import os
+import time
+import tracemalloc
+from dataclasses import dataclass, asdict
+from typing import ContextManager, Dict, Iterator, List, Optional, Sequence
+
+tools = ("cprofile", "tracemalloc")
+"""
+Optional profilers wrapped around a profiled run
+"""
+
+report_name = "profile-report.json"
+stats_name = "profile.prof"
+allocations_name = "profile-allocations.txt"
+
+_disabled = contextlib.nullcontext()
+
+
+@dataclass
+class Span:
+    name: str
+    start: float
+    """
+    Seconds since recording was enabled
+    """
+    seconds: float = 0.0
+    depth: int = 0
+    """
+    Number of spans open around this one
+    """
+    process: Optional[int] = None
+    """
+    pid of the worker process that recorded the span, None for the main process.
+    Worker span starts count from when the worker began recording.
+    """
+
+
+class Recorder:
+    """
+    Collects timing spans while enabled. Disabled, span() hands out one shared no-op context manager.
+    """
+    enabled: bool = False
+    spans: List[Span] = []
+    _origin: float = 0.0
+    _depth: int = 0
+
+    @classmethod
+    def enable(cls) -> None:
+        cls.enabled = True
+        cls.spans = []
+        cls._origin = time.perf_counter()
+        cls._depth = 0
+
+    @classmethod
+    def disable(cls) -> None:
+        cls.enabled = False
+
+    @classmethod
+    def add(cls, spans: Sequence[dict]) -> None:
+        """
+        Merges spans recorded in another process, e.g. a render worker, nested under the currently open span.
+        """
+        cls.spans.extend(Span(**{**span, "depth": span["depth"] + cls._depth}) for span in spans)
+
+    @classmethod
+    def take(cls) -> List[dict]:
+        """
+        Returns and clears the recorded spans tagged with this process id, for sending to the main process.
+        """
+        spans, cls.spans = cls.spans, []
+        return [{**asdict(span), "process": os.getpid()} for span in spans]
+
+    @classmethod
+    def totals(cls) -> Dict[str, Dict[str, float]]:
+        """
+        name -> number of spans and their summed seconds
+        """
+        totals: Dict[str, Dict[str, float]] = {}
+        for span in cls.spans:
+            total = totals.setdefault(span.name, {"count": 0, "seconds": 0.0})
+            total["count"] += 1
+            total["seconds"] += span.seconds
+        return totals
+
+    @classmethod
+    def report(cls) -> dict:
+        spans = sorted(cls.spans, key=lambda span: (span.process or 0, span.start))
+        return {"spans": [asdict(span) for span in spans], "totals": cls.totals()}
+
+
+class _Timer:
+    __slots__ = ("span",)
+
+    def __init__(self, name: str) -> None:
+        self.span = Span(name, 0.0, depth=Recorder._depth)
+
+    def __enter__(self) -> Span:
+        Recorder._depth += 1
+        self.span.start = time.perf_counter() - Recorder._origin
+        return self.span
+
+    def __exit__(self, *exc_info) -> None:
+        self.span.seconds = time.perf_counter() - Recorder._origin - self.span.start
+        Recorder._depth -= 1
+        Recorder.spans.append(self.span)
+
+
+def span(name: str) -> ContextManager:
+    """
+    Times the enclosed block as a named span while recording is enabled:
+
+    >>> with span("get_history"):
+    ...     history = get_history(teams)
+    """
+    if not Recorder.enabled:
+        return _disabled
+    return _Timer(name)
+
+
+@contextlib.contextmanager
+def profile(logs_dir: str, wrap: Sequence[str] = ()) -> Iterator[None]:
+    """
+    Records spans for the enclosed block and writes them to logs_dir/profile-report.json.
+    wrap may name any of tools: cprofile dumps logs_dir/profile.prof, tracemalloc writes the top allocation sites
+    to logs_dir/profile-allocations.txt.
+    """
+    unknown = {*wrap} - {*tools}
+    if unknown:
+        raise ValueError(f"Unknown profilers {sorted(unknown)}, expected any of {tools}")
+
+    profiler: Optional[cProfile.Profile] = cProfile.Profile() if "cprofile" in wrap else None
+    if "tracemalloc" in wrap:
+        tracemalloc.start()
+    Recorder.enable()
+    if profiler is not None:
+        profiler.enable()
+
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(os.path.join(logs_dir, stats_name))
+        Recorder.disable()
+
+        if "tracemalloc" in wrap:
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            write_allocations(snapshot, peak, os.path.join(logs_dir, allocations_name))
+
+        with open(os.path.join(logs_dir, report_name), "w") as report:
+            json.dump(Recorder.report(), report, indent=2)
+
+
+def write_allocations(snapshot: tracemalloc.Snapshot, peak: int, path: str, limit: int = 25) -> None:
+    statistics = snapshot.statistics("lineno")
+    with open(path, "w") as allocations:
+        allocations.write(f"Peak traced memory: {peak / 1024 / 1024:.1f} MiB\n")
+        allocations.write(f"Top {limit} allocation sites still held at the end of the run:\n\n")
+        for statistic in statistics[:limit]:
+            allocations.write(f"{statistic}\n")
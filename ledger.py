@@ -1,262 +1,722 @@
 from __future__ import annotations
 
-import functools
-import itertools
-import operator
-from typing import Dict, List, Tuple, Set, Generator
-from dataclasses import dataclass
-from rich import print as rprint
+import bisect
+import sys
+import threading
+from typing import (
+    Dict, List, Tuple, Set, Optional, Iterable, Iterator, Union, Sequence, FrozenSet, Callable, Hashable, TypeVar,
+)
+from dataclasses import dataclass, field, replace
 
+import numpy as np
+
+from aggregate_cache import AggregateCache
 from config import Config
+from classifier import ItemFlag, get_classifier
+from store import ItemStore, ItemIndex, NO_DATE, to_ordinal, from_ordinal
 from styles import Style
 
 DataSet = List[Tuple[str, int]]
+T = TypeVar("T")
 
 
 @dataclass
 class ReceivedItem:
+    __slots__ = (
+        "item_id", "item_name", "is_offspec", "officer_note", "received_at", "received_on", "instance_id", "flags",
+    )
+
     item_id: int
     item_name: str
     is_offspec: bool
     officer_note: str
     received_at: str
+    received_on: int
+    """
+    Day ordinal of received_at, NO_DATE when the item has no timestamp.
+    """
     instance_id: int
-    raw_data: dict
+    flags: int
+    """
+    ItemFlag bits computed by the classifier when the item is parsed.
+    EXCLUDED reflects Config.excluded_officer_note at parse time.
+    """
+
+    excluded_instances = (10, 11)
+    """
+    Add any of the following ID's to exclude that raid from data.
+
+    Gruul = 10
+    Mag = 11
+    SSC = 12
+    TK = 14
+    """
 
     @classmethod
     def parse(cls, data: dict) -> ReceivedItem:
+        classifier = get_classifier(Config.excluded_officer_note)
+        officer_note = sys.intern(data["pivot"]["officer_note"] or "")
+        item_name = sys.intern(data["name"])
+        received_at = data["pivot"]["received_at"]
+
         kwargs = {
             "item_id": data["item_id"],
-            "item_name": data["name"],
+            "item_name": item_name,
             "is_offspec": data["pivot"]["is_offspec"],
-            "officer_note": data["pivot"]["officer_note"] or "",
-            "received_at": data["pivot"]["received_at"],
+            "officer_note": officer_note,
+            "received_at": sys.intern(received_at) if received_at else received_at,
+            "received_on": to_ordinal(received_at),
             "instance_id": data["instance_id"],
-            "raw_data": data
+            "flags": classifier.classify(officer_note, item_name, data["pivot"]["is_offspec"]),
         }
         return cls(**kwargs)
 
+    @classmethod
+    def from_store(cls, store: ItemStore, rows: Union[slice, np.ndarray]) -> List[ReceivedItem]:
+        """
+        Rebuilds the items held in a range or array of ItemStore rows.
+        """
+        columns = zip(
+            store.item_id[rows].tolist(),
+            store.name[rows].tolist(),
+            store.note[rows].tolist(),
+            store.timestamp[rows].tolist(),
+            store.received[rows].tolist(),
+            store.instance_id[rows].tolist(),
+            store.flags[rows].tolist(),
+        )
+        return [
+            cls(
+                item_id=item_id,
+                item_name=store.names[name],
+                is_offspec=bool(flags & ItemFlag.OFFSPEC),
+                officer_note=store.notes[note],
+                received_at=store.timestamps[timestamp] or None,
+                received_on=received_on,
+                instance_id=instance_id,
+                flags=flags,
+            )
+            for item_id, name, note, timestamp, received_on, instance_id, flags in columns
+        ]
+
     @property
     def is_pattern_or_plan(self) -> bool:
-        return "Pattern" in self.item_name or "Plan" in self.item_name
+        return bool(self.flags & ItemFlag.PATTERN_OR_PLAN)
 
     @property
     def is_mainspec(self) -> bool:
-        return "Mainspec BIS" in self.officer_note or "Best in Slot" in self.officer_note
+        return bool(self.flags & ItemFlag.MAINSPEC)
 
     @property
     def is_upgrade(self) -> bool:
-        return "Upgrade" in self.officer_note
+        return bool(self.flags & ItemFlag.UPGRADE)
 
     @property
     def is_banked(self) -> bool:
-        return "Banking" in self.officer_note
+        return bool(self.flags & ItemFlag.BANKED)
 
     @property
     def is_pvp(self) -> bool:
-        return "PvP" in self.officer_note or "OSPvP" in self.officer_note
+        return bool(self.flags & ItemFlag.PVP)
 
     @property
     def is_other(self) -> bool:
-        return "Other" in self.officer_note
+        return bool(self.flags & ItemFlag.OTHER)
 
     @property
     def is_excluded(self) -> bool:
-        exclusions = Config.excluded_officer_note
-
-        return any(exclusion in self.officer_note for exclusion in exclusions)
+        return bool(self.flags & ItemFlag.EXCLUDED)
 
     @property
     def from_excluded_raid(self) -> bool:
-        """
-        Add any of the following ID's to exclude that raid from data.
-
-        Gruul = 10
-        Mag = 11
-        SSC = 12
-        TK = 14
-        """
-        instances: List[int] = [10, 11]
-
-        return any(instance is self.instance_id for instance in instances)
+        return self.instance_id in self.excluded_instances
 
     @property
-    def date_received(self):
-        if self.received_at:
-            date_time_split = self.received_at.split(" ")
-            return date_time_split[0]
+    def date_received(self) -> Optional[str]:
+        if self.received_on != NO_DATE:
+            return from_ordinal(self.received_on)
 
-    def received_after(self, date: str) -> bool:
-        if self.received_at:
-            date_time_split = self.received_at.split(" ")
-            year_month_day = date_time_split[0].split("-")
-            item_received_date = functools.reduce(operator.add, year_month_day)
-
-            if date <= item_received_date:
-                return True
+    def received_after(self, date: Optional[str]) -> bool:
+        return self.received_on != NO_DATE and self.received_on >= to_ordinal(date)
 
 
 @dataclass
 class Player:
-    raw_data: dict
     name: str
     id: int
     raid_group_name: str
     role: str
     role_color: str
+    index: int
+    _received: Optional[List[ReceivedItem]] = field(default=None, repr=False, compare=False)
+    _received_dates: Optional[List[int]] = field(default=None, repr=False, compare=False)
+    _source: Optional[ItemStore] = field(default=None, repr=False, compare=False)
+    """
+    Item store the received items are rebuilt from on first access, set once the parsed items are released.
+    """
+    _main_spec_cache: Dict[tuple, List[ReceivedItem]] = field(default_factory=dict, repr=False, compare=False)
+    """
+    main_spec_received views keyed on the filter configuration they were built with.
+    """
 
     @classmethod
-    def parse(cls, data: dict) -> Player:
+    def parse(cls, data: dict, index: int = 0) -> Player:
+        received = sorted(
+            (ReceivedItem.parse(item_data) for item_data in data["received"]),
+            key=lambda item: item.received_on
+        )
+
         kwargs = {
-            "raw_data": data,
             "name": data["name"],
             "id": data["id"],
-            "raid_group_name": data["raid_group_name"],
-            "role": data["class"],
-            "role_color": None
+            "raid_group_name": sys.intern(data["raid_group_name"]),
+            "role": sys.intern(data["class"]),
+            "role_color": None,
+            "index": index,
+            "_received": received,
         }
 
         return cls(**kwargs)
 
     @property
     def received(self) -> List[ReceivedItem]:
-        return [ReceivedItem.parse(item_data) for item_data in self.raw_data["received"]]
+        """
+        Sorted by received date, undated items first.
+        """
+        if self._received is None:
+            self._received = ReceivedItem.from_store(self._source, self._source.player_rows(self.index))
+
+        return self._received
+
+    def release(self, source: ItemStore) -> None:
+        """
+        Drops the parsed items once source holds them, received is rebuilt from source on the next access.
+        """
+        self._received, self._received_dates, self._source = None, None, source
+        self._main_spec_cache.clear()
+
+    @property
+    def received_dates(self) -> List[int]:
+        """
+        Day ordinals of received, used to bisect date windows.
+        """
+        if self._received_dates is None:
+            self._received_dates = [item.received_on for item in self.received]
+
+        return self._received_dates
+
+    def add_received(self, items: List[ReceivedItem]) -> None:
+        """
+        Merges newly received items, keeping received sorted by date.
+        A player reading from an item store only drops its cached views, the store must already hold the items.
+        """
+        if self._received is not None:
+            self._received = sorted([*self._received, *items], key=lambda item: item.received_on)
+        self._received_dates = None
+        self._main_spec_cache.clear()
 
     @property
     def main_spec_received(self) -> List[ReceivedItem]:
-        return [
-            item for item in self.received
-            if not item.is_excluded and item.received_after(
-                Config.date_filter) and not item.from_excluded_raid and not item.is_pattern_or_plan
-        ]
+        """
+        Items counted as mainspec loot under the current Config date window.
+        Built once per window, treat the returned list as read only. Exclusions come from the EXCLUDED flag,
+        fixed by Config.excluded_officer_note when the items were parsed.
+        """
+        key = (Config.date_filter, Config.date_until)
+        if key not in self._main_spec_cache:
+            self._main_spec_cache[key] = [
+                item for item in self.received_between(Config.date_filter, Config.date_until)
+                if not item.is_excluded and not item.from_excluded_raid and not item.is_pattern_or_plan
+            ]
 
+        return self._main_spec_cache[key]
 
-class Team(str):
-    def __contains__(self, item) -> bool:
-        contains = False
-        if isinstance(item, Player):
-            contains = self == item.raid_group_name
+    def received_between(self, since: Optional[str] = None, until: Optional[str] = None) -> List[ReceivedItem]:
+        """
+        Dated items received within the inclusive since / until window, either bound may be None.
+        """
+        start = bisect.bisect_left(self.received_dates, max(to_ordinal(since), NO_DATE + 1))
+        end = bisect.bisect_right(self.received_dates, to_ordinal(until)) if until else len(self.received_dates)
 
-        return contains
+        return self.received[start:end]
 
 
 @dataclass
 class HistoryData:
     players: List[Player]
+    items: ItemStore
 
     @classmethod
-    def parse(cls, data: List[Dict]) -> HistoryData:
+    def parse(cls, data: Iterable[Dict]) -> HistoryData:
+        """
+        Parses the players one at a time, moving each player's items into the ItemStore as it goes.
+        No raw dicts or per-item objects are kept, Player.received rebuilds them from the store when read.
+        """
+        players: List[Player] = []
+
+        def parsed_items() -> Iterator[Tuple[int, ReceivedItem]]:
+            for index, datum in enumerate(data):
+                player = Player.parse(datum, index)
+                players.append(player)
+                yield from ((index, item) for item in player.received)
+                player._received = None  # stored by now, release() points the player at the store once it is built
+
+        items = ItemStore.from_items(parsed_items())
+        for player in players:
+            player.release(items)
+
         kwargs = {
-            'players': [Player.parse(datum) for datum in data]
+            'players': players,
+            'items': items,
         }
         return cls(**kwargs)
 
 
+@dataclass
+class LootTimeline:
+    """
+    Per raid date mainspec loot for every member of a team.
+    Row i of counts and totals belongs to names[i], column j to dates[j].
+    """
+    names: List[str]
+    dates: List[str]
+    counts: np.ndarray
+    """
+    Items received on each date, shape (len(names), len(dates))
+    """
+
+    @property
+    def totals(self) -> np.ndarray:
+        """
+        Cumulative loot received up to and including each date.
+        """
+        return np.cumsum(self.counts, axis=1)
+
+
+@dataclass
+class CutoffTotals:
+    """
+    Mainspec loot received since each cutoff date for every member of a team.
+    Row i of totals belongs to names[i], column j to cutoffs[j].
+    """
+    names: List[str]
+    cutoffs: List[str]
+    totals: np.ndarray
+
+    def dataset(self, cutoff: str) -> DataSet:
+        """
+        The totals for one cutoff, sorted like Ledger.get_main_spec_dataset
+        """
+        column = self.totals[:, self.cutoffs.index(cutoff)].tolist()
+        return sorted(zip(self.names, column), key=lambda item: item[1], reverse=True)
+
+
+@dataclass
+class LootListing:
+    """
+    Mainspec item names received by every member of a team, built once and shared by both loggers
+    and the chart builder. Row i of items belongs to names[i], in date order.
+    """
+    team: str
+    names: List[str]
+    items: List[List[str]]
+
+    @property
+    def dataset(self) -> DataSet:
+        """
+        Item count of every member, sorted like Ledger.get_main_spec_dataset
+        """
+        return sorted(zip(self.names, map(len, self.items)), key=lambda item: item[1], reverse=True)
+
+    @property
+    def widths(self) -> List[int]:
+        """
+        Widest player name, item name and item count in the rows
+        """
+        most_items = max(map(len, self.items), default=0)
+        return [
+            max((len(name) for name, items in zip(self.names, self.items) if items), default=0),
+            max((len(item) for items in self.items for item in items), default=0),
+            len(str(most_items)) if most_items else 0,
+        ]
+
+    def rows(self) -> Iterator[Tuple[str, str, int]]:
+        """
+        Yields (player name, item name, running item count) for every item, member by member.
+        """
+        for name, items in zip(self.names, self.items):
+            for count, item in enumerate(items, 1):
+                yield name, item, count
+
+
+@dataclass(frozen=True)
+class LootQuery:
+    """
+    Selects the loot counted for a team. Queries are hashable and double as the key of cached results.
+    """
+    team: str
+    since: Optional[str] = None
+    """
+    Inclusive start date, YYYYMMDD or YYYY-MM-DD. None includes everything.
+    """
+    until: Optional[str] = None
+    """
+    Inclusive end date, same format as since. None runs up to the latest loot.
+    """
+    instances: Optional[FrozenSet[int]] = None
+    """
+    Instance ids to count, None counts every instance outside excluded_instances.
+    """
+    excluded_instances: FrozenSet[int] = frozenset(ReceivedItem.excluded_instances)
+    include: int = 0
+    """
+    ItemFlag bits of which at least one must be set, 0 for no requirement.
+    """
+    exclude: int = ItemFlag.EXCLUDED | ItemFlag.PATTERN_OR_PLAN
+    """
+    ItemFlag bits none of which may be set. The default counts mainspec loot like Player.main_spec_received.
+    """
+
+    @property
+    def fingerprint(self) -> Tuple:
+        """
+        Every filter except the team, identifies the query's results within a team.
+        """
+        return self.since, self.until, self.instances, self.excluded_instances, self.include, self.exclude
+
+    def __post_init__(self) -> None:
+        if self.instances is not None:
+            object.__setattr__(self, "instances", frozenset(self.instances))
+        object.__setattr__(self, "excluded_instances", frozenset(self.excluded_instances))
+
+    @classmethod
+    def from_config(cls, team: str) -> LootQuery:
+        """
+        The mainspec query for a team using the Config date window
+        """
+        return cls(team=team, since=Config.date_filter, until=Config.date_until)
+
+
 class Ledger:
-    def __init__(self, history: List[dict]) -> None:
-        self.history: HistoryData = HistoryData.parse(history)
-        self.teams = {}
+    def __init__(self, history: Union[HistoryData, Iterable[dict]], cache_size: Optional[int] = None) -> None:
+        """
+        cache_size bounds the aggregates kept in self.aggregates, Config.aggregate_cache_size when None.
+        """
+        self.history: HistoryData = history if isinstance(history, HistoryData) else HistoryData.parse(history)
+        self.teams: Dict[str, List[Player]] = {}
+        self.members: Dict[str, Dict[str, Player]] = {}
+        """
+        team name -> player name -> Player
+        """
+        self.role_colors: Dict[str, Dict[str, str]] = {}
+        """
+        team name -> player name -> role color
+        """
+        self.players_by_id: Dict[int, Player] = {player.id: player for player in self.history.players}
+        self._item_keys: Optional[Set[Tuple[int, int, int]]] = None
+        """
+        (player index, item_id, timestamp code) of every item held, built on the first ingest and kept up to date
+        """
+        self.aggregates = AggregateCache(Config.aggregate_cache_size if cache_size is None else cache_size)
+        """
+        Query results, timelines and totals keyed by (team, LootQuery.fingerprint, aggregate kind)
+        """
+        self._index: Optional[ItemIndex] = None
+        self._lock = threading.Lock()
         self.assign_role_colors()
         self.split_teams()
 
     def split_teams(self) -> None:
-        team_names = {player.raid_group_name for player in self.history.players}
-        for name in team_names:
-            self._split_team(name)
-
-    def _split_team(self, team_name: str) -> None:
+        """
+        Groups players by raid group and indexes them by name in a single pass.
+        """
+        self.teams, self.members, self.role_colors = {}, {}, {}
         for player in self.history.players:
-            if player not in Team(team_name):
-                continue
+            self._add_to_team(player)
+        self.invalidate()
+
+    def _add_to_team(self, player: Player) -> None:
+        team_name = player.raid_group_name
+        self.teams.setdefault(team_name, []).append(player)
+        self.members.setdefault(team_name, {})[player.name] = player
+        self._index_role_color(player)
 
-            self.teams[team_name] = [*self.teams.get(team_name, []), player]
+    def _index_role_color(self, player: Player) -> None:
+        self.role_colors.setdefault(player.raid_group_name, {})[player.name] = player.role_color
 
     def assign_role_colors(self) -> None:
+        """
+        Colors every player for Config.style_choice. Once the teams are split, e.g. when a batch job changes style,
+        the team name -> player name -> color index is refreshed too.
+        """
         for player in self.history.players:
-            if player.role in Style.role_colors[Config.style_choice]:
-                player.role_color = Style.role_colors[Config.style_choice][player.role]
+            self._assign_role_color(player)
+            if self.teams:
+                self._index_role_color(player)
+
+    def _assign_role_color(self, player: Player) -> None:
+        if player.role in Style.role_colors[Config.style_choice]:
+            player.role_color = Style.role_colors[Config.style_choice][player.role]
+
+    def ingest(self, history: Iterable[dict]) -> int:
+        """
+        Merges a newer export, or a delta holding only recent loot, into the ledger.
+        Items already held are recognised by (player id, item_id, received_at) and skipped, only new rows
+        are parsed and appended and only they are added to the index. Returns the number of items added.
+        """
+        items = self.history.items
+        known = self._known_items()
+        pending: Set[Tuple[int, int, str]] = set()
+        """
+        (player index, item_id, received_at) of the items added by this export
+        """
+        added: List[Tuple[int, ReceivedItem]] = []
+        received: Dict[int, List[ReceivedItem]] = {}
+        """
+        player index -> items added to the player
+        """
+        regroup = joined = False
+
+        for data in history:
+            player = self.players_by_id.get(data["id"])
+            if player is None:
+                player = Player.parse({**data, "received": []}, len(self.history.players))
+                player.release(self.history.items)
+                self.history.players.append(player)
+                self.players_by_id[player.id] = player
+                self._assign_role_color(player)
+                self._add_to_team(player)
+                joined = True
+            elif player.raid_group_name != data["raid_group_name"]:
+                player.raid_group_name = data["raid_group_name"]
+                regroup = True
+
+            for item_data in data["received"]:
+                received_at = item_data["pivot"]["received_at"] or ""
+                code = items.code("timestamps", received_at)
+                if code is not None and (player.index, item_data["item_id"], code) in known:
+                    continue
+
+                key = (player.index, item_data["item_id"], received_at)
+                if key not in pending:
+                    pending.add(key)
+                    item = ReceivedItem.parse(item_data)
+                    received.setdefault(player.index, []).append(item)
+                    added.append((player.index, item))
+
+        start = len(items)
+        if added:
+            items.extend(added)
+            new_rows = slice(start, len(items))
+            known.update(zip(items.player[new_rows].tolist(), items.item_id[new_rows].tolist(),
+                             items.timestamp[new_rows].tolist()))
+        for index, new_items in received.items():
+            self.history.players[index].add_received(new_items)
+
+        if regroup:
+            self.split_teams()
+        elif added or joined:
+            with self._lock:
+                if self._index is not None:
+                    player_teams = {index: self.history.players[index].raid_group_name for index in received}
+                    self._index.add(items, np.arange(start, len(items)), player_teams)
+            self.aggregates.clear()
+
+        return len(added)
+
+    def _known_items(self) -> Set[Tuple[int, int, int]]:
+        """
+        The item keys ingest dedupes against, read from the store columns once per Ledger
+        """
+        if self._item_keys is None:
+            items = self.history.items
+            self._item_keys = set(zip(items.player.tolist(), items.item_id.tolist(), items.timestamp.tolist()))
+
+        return self._item_keys
 
     def sequence_role_colors(self, dataset: DataSet, team_name: str) -> List[str]:
-        return functools.reduce(
-            operator.add,
-            [
-                [player.role_color for player in self.teams[team_name] if entry[0] == player.name]
-                for entry in dataset
-            ]
-        )
+        role_colors = self.role_colors[team_name]
+        return [role_colors[name] for name, _ in dataset]
 
-    def get_unique_dates(self, team_name) -> Set[str]:
-        return set(
-            functools.reduce(
-                operator.add,
-                [
-                    [item.date_received for item in player.main_spec_received]
-                    for player in self.teams[team_name]
-                ]
-            )
+    def invalidate(self) -> None:
+        """
+        Drops the index and cached aggregates, called whenever items or team membership change.
+        """
+        with self._lock:
+            self._index = None
+        self.aggregates.clear()
+
+    def _cached(self, query: LootQuery, kind: Hashable, compute: Callable[[], T]) -> T:
+        return self.aggregates.get((query.team, query.fingerprint, kind), compute)
+
+    @property
+    def index(self) -> ItemIndex:
+        with self._lock:
+            if self._index is None:
+                self._index = ItemIndex(self.history.items, [player.raid_group_name for player in self.history.players])
+            return self._index
+
+    def query_rows(self, query: LootQuery) -> np.ndarray:
+        """
+        Item store rows selected by a query, read from the index without touching Config.
+        """
+        items = self.history.items
+        rows = self.index.rows(query.team, query.instances, query.excluded_instances, query.since, query.until)
+
+        flags = items.flags[rows]
+        keep = (flags & query.exclude) == 0
+        if query.include:
+            keep &= (flags & query.include) != 0
+        return rows[keep]
+
+    def query(self, query: LootQuery) -> DataSet:
+        """
+        Loot counted by a query for every member of its team, most loot first.
+        Results are cached per query, so repeated and concurrent queries from several threads are cheap.
+        """
+        return self._cached(
+            query, "dataset", lambda: sorted(self._member_counts(query), key=lambda item: item[1], reverse=True)
         )
 
-    def _unique_dates_to_dict(self, team_name) -> Dict[str, int]:
-        return {date: 0 for date in sorted(self.get_unique_dates(team_name))}
+    def _member_counts(self, query: LootQuery) -> DataSet:
+        """
+        Loot counted by a query for every member of its team, in team order.
+        """
+        def compute() -> DataSet:
+            items = self.history.items
+            counts = np.bincount(items.player[self.query_rows(query)], minlength=len(self.history.players))
+            return [(member.name, int(counts[member.index])) for member in self.teams.get(query.team, [])]
 
-    def loot_per_raid(self, team_name) -> List[Dict[str, Dict[str, int]]]:
-        player_dates_loot_totals = []
+        return self._cached(query, "members", compute)
 
-        for player in self.teams[team_name]:
-            loot_dates = {player.name: self._unique_dates_to_dict(team_name)}
+    def _team_rows(self, team_name) -> np.ndarray:
+        """
+        Maps every player index to its row within the team, -1 for players outside the team.
+        """
+        rows = np.full(len(self.history.players), -1, dtype=np.intp)
+        rows[[player.index for player in self.teams[team_name]]] = np.arange(len(self.teams[team_name]))
+        return rows
 
-            for item in player.main_spec_received:
-                if item.date_received in loot_dates[player.name]:
-                    loot_dates[player.name][item.date_received] += 1
+    def _count_matrix(self, query: LootQuery) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the sorted unique date ordinals of the rows selected by the query, and a team member x date
+        matrix of items received on each date, built in a single pass over those rows.
+        """
+        items = self.history.items
+        members = self.teams[query.team]
+        member_rows = self._team_rows(query.team)
 
-            player_dates_loot_totals.append(loot_dates)
+        rows = self.query_rows(query)
+        received = items.received[rows]
+        dates = np.unique(received)
 
-        return player_dates_loot_totals
+        cells = member_rows[items.player[rows]] * len(dates) + np.searchsorted(dates, received)
+        counts = np.bincount(cells, minlength=len(members) * len(dates)).reshape(len(members), len(dates))
+        return dates, counts
 
-    def _accumulate_loot_totals(self, team_name) -> Generator[List[int]]:
-        player_dates_loot_totals = self.loot_per_raid(team_name)
+    def loot_timeline(self, team_name, query: Optional[LootQuery] = None) -> LootTimeline:
+        """
+        Per date mainspec loot of the team, selected by query or LootQuery.from_config when omitted.
+        """
+        query = query or LootQuery.from_config(team_name)
 
-        for player in player_dates_loot_totals:
-            for loot_dates in player:
-                loot_per_date = list(player[loot_dates].values())
-                total_over_time = list(itertools.accumulate(loot_per_date))
-                yield total_over_time
+        def compute() -> LootTimeline:
+            dates, counts = self._count_matrix(query)
+            kwargs = {
+                "names": [player.name for player in self.teams[query.team]],
+                "dates": [from_ordinal(date) for date in dates.tolist()],
+                "counts": counts,
+            }
+            return LootTimeline(**kwargs)
 
-    def _accumulated_with_dates(self, team_name) -> Generator[Dict[str, int]]:
-        player_dates_loot = self.loot_per_raid(team_name)
-        totals = self._accumulate_loot_totals(team_name)
+        return self._cached(query, "timeline", compute)
+
+    def totals_since(self, team_name, cutoffs: Sequence[str], query: Optional[LootQuery] = None) -> CutoffTotals:
+        """
+        Mainspec totals for every member since each cutoff date (YYYYMMDD), e.g. one per content phase.
+        The since bound of the query (LootQuery.from_config when omitted) is replaced by the cutoffs.
+        One count matrix is built and summed from the latest date backwards, so each cutoff is a column lookup.
+        """
+        query = replace(query or LootQuery.from_config(team_name), since=None)
+
+        def compute() -> CutoffTotals:
+            dates, counts = self._count_matrix(query)
+
+            since = np.zeros((counts.shape[0], counts.shape[1] + 1), dtype=np.int64)
+            since[:, :-1] = np.cumsum(counts[:, ::-1], axis=1)[:, ::-1]
+            columns = np.searchsorted(dates, [to_ordinal(cutoff) for cutoff in cutoffs])
+
+            kwargs = {
+                "names": [player.name for player in self.teams[query.team]],
+                "cutoffs": [*cutoffs],
+                "totals": since[:, columns],
+            }
+            return CutoffTotals(**kwargs)
+
+        return self._cached(query, ("totals", tuple(cutoffs)), compute)
+
+    def loot_listing(self, team_name, query: Optional[LootQuery] = None) -> LootListing:
+        """
+        Mainspec items of every member selected by query, LootQuery.from_config when omitted.
+        Lists the same items as Player.main_spec_received, read from the index in one pass.
+        """
+        query = query or LootQuery.from_config(team_name)
 
-        for player in player_dates_loot:
-            for loot_dates in player:
-                dates = list(player[loot_dates].keys())
-                for total in totals:
-                    yield dict(zip(dates, total))
+        def compute() -> LootListing:
+            items = self.history.items
+            members = self.teams[query.team]
+            member_of = self._team_rows(query.team)
+            rows = self.query_rows(query)
+            rows = rows[np.lexsort((rows, items.received[rows], member_of[items.player[rows]]))]
+
+            member_rows = member_of[items.player[rows]]
+            bounds = np.searchsorted(member_rows, np.arange(len(members) + 1)).tolist()
+            names = [items.names[code] for code in items.name[rows].tolist()]
+
+            kwargs = {
+                "team": query.team,
+                "names": [member.name for member in members],
+                "items": [names[start:end] for start, end in zip(bounds, bounds[1:])],
+            }
+            return LootListing(**kwargs)
+
+        return self._cached(query, "listing", compute)
+
+    def get_unique_dates(self, team_name) -> Set[str]:
+        return {*self.loot_timeline(team_name).dates}
+
+    def loot_per_raid(self, team_name) -> List[Dict[str, Dict[str, int]]]:
+        timeline = self.loot_timeline(team_name)
+
+        return [
+            {name: dict(zip(timeline.dates, loot))}
+            for name, loot in zip(timeline.names, timeline.counts.tolist())
+        ]
 
     def loot_over_time(self, team_name) -> Dict[str, Dict[str, int]]:
-        accumulated_loot = self._accumulated_with_dates(team_name)
+        def compute() -> Dict[str, Dict[str, int]]:
+            timeline = self.loot_timeline(team_name)
+            return {
+                name: dict(zip(timeline.dates, totals))
+                for name, totals in zip(timeline.names, timeline.totals.tolist())
+            }
 
-        return {player.name: next(accumulated_loot) for player in self.teams[team_name]}
+        return self._cached(LootQuery.from_config(team_name), "over-time", compute)
 
-    @property
-    def loot_allocation_all(self) -> Dict[str, int]:
+    def _allocation(self, counts: np.ndarray) -> Dict[str, Dict[str, int]]:
         return {
-            team_name: {member.name: len(member.received) for member in members}
+            team_name: {member.name: int(counts[member.index]) for member in members}
             for team_name, members in self.teams.items()
         }
 
+    @property
+    def loot_allocation_all(self) -> Dict[str, int]:
+        items = self.history.items
+        return self._allocation(items.per_player(np.ones(len(items), dtype=bool), len(self.history.players)))
+
     @property
     def loot_allocation_main_spec(self) -> Dict[str, int]:
-        return {
-            team_name: {member.name: len(member.main_spec_received) for member in members}
-            for team_name, members in self.teams.items()
-        }
+        return {team_name: dict(self._member_counts(LootQuery.from_config(team_name))) for team_name in self.teams}
 
-    @functools.lru_cache(maxsize=2)
     def get_main_spec_dataset(self, team_name: str) -> DataSet:
-        points = sorted(
-            self.loot_allocation_main_spec.get(team_name, {}).items(),
-            key=lambda item: item[1],
-            reverse=True,
-        )
-
-        return points
+        return self.query(LootQuery.from_config(team_name))
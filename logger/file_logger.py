@@ -1,5 +1,7 @@
+from typing import List, Optional
+
 from config import Config
-from table.table import Schema, Table
+from table.table import Schema, TableWriter
 from rich.console import Console
 from rich.table import Table as RichTable
 from rich import box
@@ -16,56 +18,74 @@ class FilesystemLogger(Logger):
     def log_main_spec(cls, ledger, team_name: str) -> None:
         """
         Writes a log to file with player & item names to accompany main spec loot charts.
-        Uses custom table logic for formatting.
+        Uses custom table logic for formatting, rows are streamed to the file as they are formatted.
         """
+        listing = ledger.loot_listing(team_name)
         schema = Schema(["Player Name", "Item Name", "Item Count"])
-        table: Table = schema.new_table()
-        table.hline()
-        for player in ledger.teams[team_name]:
-            for i, item in enumerate(player.main_spec_received):
-                table.add_row(player.name, item.item_name, i + 1)
-            table.hline()
 
-        log = table.format(headings=True)
         with open(f"{Config.logs_dir}/{team_name}-chart-log.txt", "w") as logfile:
-            logfile.write(log)
+            table = TableWriter(logfile, schema, listing.widths)
+            table.hline()
+            for name, items in zip(listing.names, listing.items):
+                for i, item_name in enumerate(items):
+                    table.add_row(name, item_name, i + 1)
+                table.hline()
 
 
 class TerminalLogger(Logger):
+    headings = {
+        "Player Name": "cyan",
+        "Item Name": "medium_orchid",
+        "Item Count": "gold3"
+    }
+
+    page_size: Optional[int] = None
+    """
+    Rows printed per table, None fits each table to the terminal height, or prints a single table when the output
+    is not a terminal. Every page is printed as soon as its rows are added, so large teams start showing immediately.
+    """
+
     @classmethod
     def log_main_spec(cls, ledger, team_name: str) -> None:
         """
         Prints a log to terminal with player & item names to accompany main spec loot charts.
-        Uses RichTable for fancy formatting.
+        Uses RichTable for fancy formatting, one page at a time with the columns lined up across pages.
         """
-        headings = {
-            "Player Name": "cyan",
-            "Item Name": "medium_orchid",
-            "Item Count": "gold3"
-        }
+        listing = ledger.loot_listing(team_name)
+        console = Console()
+        widths = [max(width, len(heading)) for width, heading in zip(listing.widths, cls.headings)]
+        page_size = cls.page_size
+        if page_size is None and console.is_terminal:
+            page_size = max(1, (console.height - 6) // 2)
 
+        table = cls._new_page(widths, title=True)
+        for name, item_name, count in listing.rows():
+            if page_size and len(table.rows) == page_size:
+                console.print(table)
+                table = cls._new_page(widths, title=False)
+            table.add_row(name, item_name, str(count))
+
+        console.print(table)
+        print()
+
+    @classmethod
+    def _new_page(cls, widths: List[int], title: bool) -> RichTable:
         table = RichTable(
             box=box.ROUNDED,
-            title="[bold]Mainspec / Upgrade Loot Count[/bold]",
+            title="[bold]Mainspec / Upgrade Loot Count[/bold]" if title else None,
             style="pale_green3",
             title_style="pale_green3",
             show_lines=True,
         )
 
-        for i, heading in enumerate(headings):
-            if heading in headings.keys():
-                table.add_column(
-                    heading,
-                    justify="center",
-                    style=headings[heading],
-                    header_style=headings[heading],
-                    no_wrap=True
-                )
-
-        for player in ledger.teams[team_name]:
-            for i, item in enumerate(player.main_spec_received):
-                table.add_row(player.name, item.item_name, str(i + 1))
+        for heading, width in zip(cls.headings, widths):
+            table.add_column(
+                heading,
+                justify="center",
+                style=cls.headings[heading],
+                header_style=cls.headings[heading],
+                no_wrap=True,
+                width=width,
+            )
 
-        console = Console()
-        console.print(table)
-        print()
+        return table
@@ -1,32 +1,55 @@
 #! /usr/bin/env python
+from __future__ import annotations
+
 import functools
-import json
 import os
 import sys
 from operator import add
 from pathlib import Path
 from subprocess import call
-from typing import List
+from typing import List, Iterable, TYPE_CHECKING
 from rich import print as rprint
 from rich.console import Console
 from rich.prompt import Prompt, Confirm
-from rich.progress import track
 
-import plots
+import instrument
+import snapshot
 from config import Config
-from ledger import Ledger, DataSet
-from logger.file_logger import TerminalLogger  # FilesystemLogger
+from ingest import iter_players
+from ledger import Ledger, DataSet, LootTimeline, HistoryData
+from logger.file_logger import TerminalLogger, FilesystemLogger
+from instrument import span
+from store import to_ordinal
 from styles import Style
 
+if TYPE_CHECKING:
+    import plots
+
 team_x = "Team X - Rainbow"
 team_y = "Team Y - nicorn"
 
 team_names = {"X": team_x, "Y": team_y}
 
 
+def team_name(team: str) -> str:
+    """
+    Resolves a team flag from team_names, any other value is taken as the raid group name itself.
+    """
+    return team_names.get(team, team)
+
+
 def parse_args() -> List[str]:
+    """
+    Returns the requested team flags. Passing --log-only sets Config.log_only,
+    --profile sets Config.profile and --profile=cprofile,tracemalloc also sets Config.profile_tools.
+    """
     args = sys.argv[1:]
     team_flags = {*team_names.keys()}
+    Config.log_only = "--log-only" in args
+    for arg in args:
+        if arg == "--profile" or arg.startswith("--profile="):
+            Config.profile = True
+            Config.profile_tools = tuple(tool for tool in arg.partition("=")[2].split(",") if tool)
     return [*({*args} & team_flags)]
 
 
@@ -44,9 +67,21 @@ def date_filter_prompt():
 
     rprint(f"{date_prompt} {year_end}{month_pair}{day_pair}")
 
-    supplied_date = input()
-    rprint()
-    Config.date_filter = f"20{supplied_date}"
+    while True:
+        supplied_date = input().strip()
+        rprint()
+        if not supplied_date:
+            Config.date_filter = None
+            return
+
+        try:
+            to_ordinal(f"20{supplied_date}")
+        except ValueError:
+            rprint(f"[bold red]{supplied_date!r} is not a YYMMDD date, try again or press Enter for all loot:[/bold red]")
+            continue
+
+        Config.date_filter = f"20{supplied_date}"
+        return
 
 
 def style_choice_prompt():
@@ -68,19 +103,19 @@ def log_prompt():
 
 def write_chart_log(guild, teams):
     for team in teams:
-        FilesystemLogger.log_main_spec(guild, team_names[team])
+        FilesystemLogger.log_main_spec(guild, team_name(team))
 
 
 def terminal_log_main_spec(guild, teams):
     for team in teams:
-        TerminalLogger.log_main_spec(guild, team_names[team])
+        TerminalLogger.log_main_spec(guild, team_name(team))
 
 
 def loot_received_dates(guild, teams):
     for team in teams:
-        # rprint(guild.unique_dates_to_dict(team_names[team]))
-        # rprint(guild.loot_per_raid(team_names[team]))
-        rprint([guild.loot_over_time(team_names[team]) for team in teams])
+        # rprint(guild.unique_dates_to_dict(team_name(team)))
+        # rprint(guild.loot_per_raid(team_name(team)))
+        rprint([guild.loot_over_time(team_name(team)) for team in teams])
 
 
 def clear_terminal(console):
@@ -92,23 +127,25 @@ def construct_chart_list(guild, teams) -> List[plots.Chart]:
     """
     For the list of teams supplied, a list of charts to be saved is returned
     """
-    datasets = [guild.get_main_spec_dataset(team_names[team]) for team in teams]
-    color_sequences = [guild.sequence_role_colors(datasets[i], team_names[team]) for i, team in enumerate(teams)]
+    datasets = [guild.loot_listing(team_name(team)).dataset for team in teams]
+    color_sequences = [guild.sequence_role_colors(datasets[i], team_name(team)) for i, team in enumerate(teams)]
 
-    accumulated_loot_data = [guild.loot_over_time(team_names[team]) for team in teams]
+    timelines = [guild.loot_timeline(team_name(team)) for team in teams]
 
-    args_list = [(color_sequences[i], datasets[i], accumulated_loot_data[i], team) for i, team in enumerate(teams)]
+    args_list = [(color_sequences[i], datasets[i], timelines[i], team) for i, team in enumerate(teams)]
 
     charts = functools.reduce(add, [select_charts(*args) for args in args_list])
     return charts
 
 
-def select_charts(color_sequence: List[str], dataset: DataSet, accumulated_loot_data, team_id: str) -> List[plots.Chart]:
+def select_charts(color_sequence: List[str], dataset: DataSet, timeline: LootTimeline, team_id: str) -> List[plots.Chart]:
+    import plots  # pulls in matplotlib, only paid for when a chart is rendered
+
     charts = {
         "bar": plots.BarChart(dataset, color_sequence),
         "pie": plots.PieChart(dataset, color_sequence),
         "hist": plots.Histogram(dataset),
-        "over-time": plots.LootOverTime(accumulated_loot_data),
+        "over-time": plots.LootOverTime(timeline),
         "combined": plots.CombinedPieBar(dataset, color_sequence)
     }
     charts = [charts[chart_name] for chart_name in Config.get_charts_to_render()]
@@ -131,10 +168,16 @@ def prep_logs_dir() -> None:
     Path(Config.logs_dir).mkdir(parents=True, exist_ok=True)
 
 
-def get_history() -> List[dict]:
-    with open(f"{Config.history_dir}/character-json.json") as fusion_history:
-        history = json.load(fusion_history)
-    return history
+def get_history(teams: Iterable[str]) -> HistoryData:
+    """
+    Loads the parsed history from its snapshot when caching is enabled.
+    Otherwise streams the players of the requested teams from the export, other teams are never materialised.
+    """
+    path = f"{Config.history_dir}/character-json.json"
+    if Config.cache_dir:
+        return snapshot.load_history(path, Config.cache_dir)
+
+    return HistoryData.parse(iter_players(path, {*teams}))
 
 
 def main(teams: List[str], console: Console) -> None:
@@ -145,26 +188,45 @@ def main(teams: List[str], console: Console) -> None:
         prep_charts_dir()
         prep_logs_dir()
 
-    date_filter_prompt()
-    style_choice_prompt()
-
-    history = get_history()
-    guild = Ledger(history)
-
-    charts = construct_chart_list(guild, teams)
-
-    if log_prompt():
+    with span("prompts"):
+        date_filter_prompt()
+        if Config.log_only:
+            Config.style_choice = "default"
+        else:
+            style_choice_prompt()
+
+    with span("get_history"):
+        history = get_history(team_name(team) for team in teams)
+    with span("Ledger.__init__"):
+        guild = Ledger(history)
+
+    with span("prompts"):
+        show_log = Config.log_only or log_prompt()
+    if show_log:
         clear_terminal(console)
-        terminal_log_main_spec(guild, teams)
-        write_chart_log(guild, teams)
+        with span("TerminalLogger"):
+            terminal_log_main_spec(guild, teams)
+        with span("FilesystemLogger"):
+            write_chart_log(guild, teams)
 
-    for chart in charts:  # track(charts, description="[bold gold3]Processing...[/bold gold3]"):
-        # chart.render()
-        chart.save_chart()
+    if Config.get_charts_to_render():
+        with span("import render"):
+            import render  # pulls in matplotlib, see select_charts
+
+        with span("construct_chart_list"):
+            charts = construct_chart_list(guild, teams)
+        with span("render_charts"):
+            render.render_charts(charts, Config.render_jobs)
 
     # loot_received_dates(guild, teams)
 
 
-_console = Console()
-chosen_team = parse_args()
-main(chosen_team, _console)
+if __name__ == "__main__":
+    _console = Console()
+    chosen_team = parse_args()
+    if Config.profile:
+        with instrument.profile(Config.logs_dir, Config.profile_tools):
+            main(chosen_team, _console)
+    else:
+        main(chosen_team, _console)
+
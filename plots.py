@@ -1,22 +1,44 @@
-from typing import List, Tuple, Dict, Optional
+import hashlib
+import json
+import os
+from typing import List, Tuple, Dict, Optional, Set, Iterator
 
 import matplotlib.pyplot as plt
 import numpy as np
-import pandas as pd
+from matplotlib.axes import Axes
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+from matplotlib.text import Text
 from rich.progress import track
 
 from config import Config
+from instrument import span
+from ledger import LootTimeline
 from styles import choose_style, choose_bar_style, Style, choose_over_time_style
 
 DataPoints = List[Tuple[str, int]]
 DataSeries = Tuple[List[str], List[int]]
 
+chart_cache_version = 1
+"""
+Part of every chart digest, bump when a change to the drawing code should re-render unchanged data.
+"""
+
+
+def digest(*inputs) -> str:
+    return hashlib.sha1(json.dumps([chart_cache_version, *inputs], default=str).encode()).hexdigest()
+
 
 # noinspection PyTypeChecker
 class Chart:
     _team_id: str
     data: DataPoints
 
+    _applied_style: Optional[tuple] = None
+    """
+    rcParams style last applied in this process, re-applying the same style is skipped.
+    """
+
     def normalise_dataset(self) -> DataSeries:
         series: DataSeries = tuple([point[i] for point in self.data] for i in (0, 1))
         return series
@@ -27,10 +49,51 @@ class Chart:
     def render(self) -> None:
         raise NotImplementedError("Do not invoke the interface directly!")
 
+    def figures(self) -> Iterator[Tuple[str, Figure]]:
+        """
+        Yields each output path with its figure ready to save. A figure is only valid until the next one is requested.
+        """
+        self.populate_chart()
+        yield self.output_path(), plt.gcf()
+
     def save_chart(self) -> None:
+        for path, figure in self.figures():
+            with span(f"savefig {os.path.basename(path)}"):
+                figure.savefig(path)
+
+    def output_path(self) -> str:
+        raise NotImplementedError("Do not invoke the interface directly!")
+
+    def cache_inputs(self) -> tuple:
+        """
+        Everything besides the style that determines the rendered image.
+        """
         raise NotImplementedError("Do not invoke the interface directly!")
 
-    def apply_style(self, text_color, label_color, edge_color, title_color, show_grid, grid_behind_data, font) -> None:
+    def outputs(self) -> Dict[str, str]:
+        """
+        Maps each file written by save_chart to a digest of the inputs it is rendered from.
+        """
+        return {self.output_path(): digest(type(self).__name__, Config.style_choice, self.cache_inputs())}
+
+    def select(self, paths: Set[str]) -> Optional["Chart"]:
+        """
+        Returns a chart writing only the given outputs, None when there is nothing left to write.
+        """
+        return self if self.output_path() in paths else None
+
+    def split(self, parts: int) -> List["Chart"]:
+        """
+        Divides the chart into at most `parts` independently renderable charts, for parallel rendering.
+        """
+        return [self]
+
+    @classmethod
+    def apply_style(cls, text_color, label_color, edge_color, title_color, show_grid, grid_behind_data, font) -> None:
+        style = (text_color, label_color, edge_color, title_color, show_grid, grid_behind_data, font)
+        if Chart._applied_style == style:
+            return
+
         plt.rcdefaults()
         plt.rcParams.update(
             {
@@ -44,6 +107,7 @@ class Chart:
                 'font.size': 12
             }
         )
+        Chart._applied_style = style
 
     def apply_chart_style(self, figure, axes, title, xlabel, tick_colors, face_color, grid_color) -> None:
         axes.set_title(title)
@@ -85,14 +149,16 @@ class PieChart(Chart):
         ax.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle.
         fig.patch.set_facecolor(Style.colors["almost_black"])
 
+    def output_path(self) -> str:
+        return f"{Config.charts_dir}/{self.team_id}-loot-pie.png"
+
+    def cache_inputs(self) -> tuple:
+        return (self.data, self.role_colors)
+
     def render(self) -> None:
         self.populate_chart()
         plt.show()
 
-    def save_chart(self):
-        self.populate_chart()
-        plt.savefig(f"{Config.charts_dir}/{self.team_id}-loot-pie.png")
-
 
 class BarChart(Chart):
     def __init__(self, data: DataPoints, role_colors: List[str]):
@@ -118,14 +184,16 @@ class BarChart(Chart):
             **choose_bar_style(Config.style_choice)
         )
 
+    def output_path(self) -> str:
+        return f"{Config.charts_dir}/{self.team_id}-loot-bars.png"
+
+    def cache_inputs(self) -> tuple:
+        return (self.data, self.role_colors)
+
     def render(self) -> None:
         self.populate_chart()
         plt.show()
 
-    def save_chart(self) -> None:
-        self.populate_chart()
-        plt.savefig(f"{Config.charts_dir}/{self.team_id}-loot-bars")
-
 
 class CombinedPieBar(Chart):
     def __init__(self, data: DataPoints, role_colors: List[str]):
@@ -164,22 +232,64 @@ class CombinedPieBar(Chart):
         )
         pie.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle.
 
+    def output_path(self) -> str:
+        return f"{Config.charts_dir}/{self.team_id}-bar-and-pie.png"
+
+    def cache_inputs(self) -> tuple:
+        return (self.team_id, self.data, self.role_colors)
+
     def render(self) -> None:
         self.populate_chart()
         plt.show()
 
-    def save_chart(self) -> None:
-        self.populate_chart()
-        plt.savefig(f"{Config.charts_dir}/{self.team_id}-bar-and-pie")
-
 
 class LootOverTime(Chart):
-    def __init__(self, loot_data):
-        self.loot_data = loot_data
+    show_progress: bool = True
+
+    def __init__(self, timeline: LootTimeline):
+        self.timeline = timeline
+
+    def player_path(self, name: str) -> str:
+        return f"{Config.charts_dir}/{name}-loot-over-time.png"
+
+    def outputs(self) -> Dict[str, str]:
+        """
+        One output per player. Each digest covers the team's date axis, so a new raid date re-renders every player.
+        """
+        return {
+            self.player_path(name): digest(type(self).__name__, Config.style_choice, name, self.timeline.dates, totals)
+            for name, totals in zip(self.timeline.names, self.timeline.totals.tolist())
+        }
+
+    def select(self, paths: Set[str]) -> Optional[Chart]:
+        rows = [i for i, name in enumerate(self.timeline.names) if self.player_path(name) in paths]
+        return self._with_rows(rows) if rows else None
+
+    def split(self, parts: int) -> List[Chart]:
+        size = -(-len(self.timeline.names) // max(parts, 1)) or 1
+        return [
+            self._with_rows(range(start, min(start + size, len(self.timeline.names))))
+            for start in range(0, len(self.timeline.names), size)
+        ]
+
+    def _with_rows(self, rows) -> "LootOverTime":
+        rows = [*rows]
+        chart = LootOverTime(
+            LootTimeline(
+                names=[self.timeline.names[i] for i in rows],
+                dates=self.timeline.dates,
+                counts=self.timeline.counts[rows],
+            )
+        )
+        chart.team_id = self.team_id
+        return chart
 
-    def populate_chart(self, name) -> None:
+    def populate_chart(self) -> Tuple[Figure, Axes, Line2D, Text]:
+        """
+        Builds the figure shared by every player in the timeline, the players only differ by title and line data.
+        """
         fig, ax = plt.subplots(tight_layout=True)
-        fig.suptitle(name, color=Style.colors["ocean"])
+        title = fig.suptitle("", color=Style.colors["ocean"])
         plt.xticks(rotation=45)
         plt.locator_params(axis="y", integer=True)  # ensure integers for Y label
 
@@ -192,22 +302,29 @@ class LootOverTime(Chart):
             **choose_over_time_style(Config.style_choice)
         )
 
-        Data = {'Date': self.loot_data[name].keys(),
-                'Loot': self.loot_data[name].values()
-                }
-
-        df = pd.DataFrame(Data, columns=['Date', 'Loot'])
-
-        ax.plot(df['Date'], df['Loot'], color=Style.colors["goldenrod"], marker='o')
+        line, = ax.plot(self.timeline.dates, [0] * len(self.timeline.dates), color=Style.colors["goldenrod"], marker='o')
+        return fig, ax, line, title
 
     def render(self) -> None:
         raise NotImplementedError("Do not invoke the interface directly!")
 
-    def save_chart(self) -> None:
-        for name in track(self.loot_data, description=f"[bold gold3]Processing...[/bold gold3]"):
-            self.populate_chart(name)
-            plt.savefig(f"{Config.charts_dir}/{name}-loot-over-time")
-            plt.close()
+    def figures(self) -> Iterator[Tuple[str, Figure]]:
+        fig, ax, line, title = self.populate_chart()
+        margins = {side: getattr(fig.subplotpars, side) for side in ("left", "bottom", "right", "top")}
+
+        players = zip(self.timeline.names, self.timeline.totals.tolist())
+        description = f"[bold gold3]Processing...[/bold gold3]"
+        for name, totals in track(
+                players, total=len(self.timeline.names), description=description, disable=not self.show_progress
+        ):
+            title.set_text(name)
+            line.set_ydata(totals)
+            ax.relim()
+            ax.autoscale_view()
+            fig.subplots_adjust(**margins)  # tight_layout adjusts from the current margins, start every player afresh
+            yield self.player_path(name), fig
+
+        plt.close(fig)
 
 
 class Histogram(Chart):
@@ -233,10 +350,12 @@ class Histogram(Chart):
         ax.set_title("Loot Histogram")
         ax.hist(values, bins=n_bins, align="mid")
 
+    def output_path(self) -> str:
+        return f"{Config.charts_dir}/{self.team_id}-histogram.png"
+
+    def cache_inputs(self) -> tuple:
+        return (self.data,)
+
     def render(self) -> None:
         self.populate_chart()
         plt.show()
-
-    def save_chart(self) -> None:
-        self.populate_chart()
-        plt.savefig(f"{Config.charts_dir}/{self.team_id}-histogram")
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import List, Iterable
+
+import matplotlib
+import matplotlib.pyplot as plt
+
+import plots
+from chart_cache import ChartCache
+from config import Config
+from instrument import Recorder, span
+from styles import choose_style
+
+
+@dataclass
+class ChartJob:
+    """
+    Picklable description of one chart render: the chart with its data, the style and the output dir.
+    """
+    chart: plots.Chart
+    style: str
+    charts_dir: str
+
+    @property
+    def label(self) -> str:
+        label = type(self.chart).__name__
+        if isinstance(self.chart, plots.LootOverTime):
+            return f"{label} ({', '.join(self.chart.timeline.names)})"
+
+        return f"{label} ({self.chart.team_id})"
+
+
+@dataclass
+class RenderResult:
+    label: str
+    seconds: float
+    spans: List[dict] = field(default_factory=list)
+    """
+    Spans recorded by a profiled worker process, see instrument.Recorder.take
+    """
+
+
+def apply_style(style: str) -> None:
+    """
+    Applies a style's rcParams up front, so every chart starts from the same state whichever renders first.
+    """
+    plots.Chart.apply_style(*choose_style(style))
+
+
+def _init_worker(style: str, profile: bool) -> None:
+    matplotlib.use("Agg")
+    Config.style_choice = style
+    apply_style(style)
+    if profile:
+        Recorder.enable()
+
+
+def _run(job: ChartJob, show_progress: bool = True) -> RenderResult:
+    Config.style_choice = job.style
+    Config.charts_dir = job.charts_dir
+    if isinstance(job.chart, plots.LootOverTime):
+        job.chart.show_progress = show_progress
+
+    start = time.perf_counter()
+    with span(f"save_chart {type(job.chart).__name__}"):
+        job.chart.save_chart()
+        plt.close("all")
+    return RenderResult(job.label, time.perf_counter() - start)
+
+
+def _run_in_worker(job: ChartJob) -> RenderResult:
+    result = _run(job, show_progress=False)
+    if Recorder.enabled:
+        result.spans = Recorder.take()
+    return result
+
+
+def plan_jobs(charts: Iterable[plots.Chart], jobs: int) -> List[ChartJob]:
+    """
+    Wraps charts as jobs using the current Config, splitting charts that support it across the workers.
+    """
+    return [
+        ChartJob(part, Config.style_choice, Config.charts_dir)
+        for chart in charts
+        for part in chart.split(jobs)
+    ]
+
+
+def render_charts(charts: Iterable[plots.Chart], jobs: int = 1) -> List[RenderResult]:
+    """
+    Saves every chart and returns the time each job took.
+    jobs=1 renders serially in this process, otherwise jobs are fanned out across that many worker processes.
+    With Config.chart_cache enabled, outputs already rendered from the same inputs are skipped.
+    """
+    cache = ChartCache(Config.charts_dir) if Config.chart_cache else None
+    if cache is not None:
+        charts = cache.stale(charts)
+
+    if jobs <= 1:
+        apply_style(Config.style_choice)
+        results = [_run(job) for job in plan_jobs(charts, 1)]
+    else:
+        initargs = (Config.style_choice, Recorder.enabled)
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=initargs) as pool:
+            futures = [pool.submit(_run_in_worker, job) for job in plan_jobs(charts, jobs)]
+            results = [future.result() for future in as_completed(futures)]
+
+        for result in results:
+            Recorder.add(result.spans)
+
+    if cache is not None:
+        cache.record(charts)
+        cache.save()
+
+    return results
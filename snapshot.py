@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+from typing import Optional
+
+import numpy as np
+
+from config import Config
+from ingest import iter_players
+from ledger import HistoryData, Player
+from store import ItemStore
+
+SNAPSHOT_VERSION = 1
+"""
+Bump when the snapshot layout or the classification rules change, to invalidate existing snapshots.
+"""
+
+player_columns = ("player_id", "player_name", "player_team", "player_class")
+
+
+def fingerprint(path: str) -> dict:
+    """
+    Identifies an export and the classifier configuration its items were flagged with.
+    A snapshot is only reused when every field matches.
+    """
+    stat = os.stat(path)
+    digest = hashlib.blake2b()
+    with open(path, "rb") as export:
+        for chunk in iter(lambda: export.read(1 << 20), b""):
+            digest.update(chunk)
+
+    return {
+        "version": SNAPSHOT_VERSION,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "blake2b": digest.hexdigest(),
+        "excluded_officer_note": [*Config.excluded_officer_note],
+    }
+
+
+def save(history: HistoryData, key: dict, directory: str) -> None:
+    """
+    Writes one .npy file per column plus a manifest holding the key.
+    The snapshot is staged next to the destination and swapped in once complete.
+    """
+    staging = f"{directory}.tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    players = history.players
+    items = history.items.in_player_order()
+    arrays = {
+        "player_id": np.array([player.id for player in players], dtype=np.int64),
+        "player_name": np.array([player.name for player in players], dtype=str),
+        "player_team": np.array([player.raid_group_name for player in players], dtype=str),
+        "player_class": np.array([player.role for player in players], dtype=str),
+        **{column: np.asarray(getattr(items, column)) for column in ItemStore.columns},
+        **{pool: np.array(getattr(items, pool), dtype=str) for pool in ItemStore.pools},
+    }
+    for name, array in arrays.items():
+        np.save(os.path.join(staging, f"{name}.npy"), array)
+
+    with open(os.path.join(staging, "manifest.json"), "w") as manifest:
+        json.dump(key, manifest)
+
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(staging, directory)
+
+
+def load(key: dict, directory: str) -> Optional[HistoryData]:
+    """
+    Memory maps a snapshot written by save, returns None when it is missing or was written for a different key.
+    Players rebuild their received items from the mapped columns on first access.
+    """
+    try:
+        with open(os.path.join(directory, "manifest.json")) as manifest:
+            if json.load(manifest) != key:
+                return None
+
+        arrays = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+            for name in (*player_columns, *ItemStore.columns, *ItemStore.pools)
+        }
+    except (OSError, ValueError):
+        return None
+
+    items = ItemStore(
+        **{column: arrays[column] for column in ItemStore.columns},
+        **{pool: arrays[pool].tolist() for pool in ItemStore.pools},
+    )
+    players = [
+        Player(
+            name=name,
+            id=player_id,
+            raid_group_name=sys.intern(team),
+            role=sys.intern(role),
+            role_color=None,
+            index=index,
+            _source=items,
+        )
+        for index, (player_id, name, team, role) in enumerate(
+            zip(*(arrays[column].tolist() for column in player_columns))
+        )
+    ]
+    return HistoryData(players=players, items=items)
+
+
+def load_history(path: str, cache_dir: str) -> HistoryData:
+    """
+    Returns the parsed history for an export, from its snapshot when one matches,
+    otherwise by parsing the export and writing a fresh snapshot.
+    """
+    key = fingerprint(path)
+    directory = os.path.join(cache_dir, "ledger")
+
+    history = load(key, directory)
+    if history is None:
+        history = HistoryData.parse(iter_players(path))
+        save(history, key, directory)
+
+    return history
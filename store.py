@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+import datetime
+import itertools
+from dataclasses import dataclass, field, replace
+from typing import Optional, Sequence, Iterable, List, Dict, Mapping, Tuple, Union, TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from ledger import ReceivedItem
+
+NO_DATE = 0
+"""
+Ordinal used for items without a received_at timestamp. Sorts before every real date.
+"""
+
+
+def to_ordinal(date: Optional[str]) -> int:
+    """
+    Converts a YYYYMMDD date filter or a YYYY-MM-DD[ HH:MM:SS] timestamp to a proleptic Gregorian day ordinal.
+    Raises ValueError for anything that is not a full, valid date.
+    """
+    if not date:
+        return NO_DATE
+
+    digits = date[:10].replace("-", "")
+    if len(digits) != 8 or not digits.isdigit():
+        raise ValueError(f"Expected a YYYYMMDD date or YYYY-MM-DD timestamp, got {date!r}")
+
+    try:
+        return datetime.date(int(digits[:4]), int(digits[4:6]), int(digits[6:8])).toordinal()
+    except ValueError as error:
+        raise ValueError(f"Invalid date {date!r}: {error}") from None
+
+
+def from_ordinal(ordinal: int) -> str:
+    """
+    Converts a day ordinal back to the YYYY-MM-DD format used by ReceivedItem.date_received
+    """
+    return datetime.date.fromordinal(ordinal).isoformat()
+
+
+@dataclass
+class ItemStore:
+    """
+    Columnar table of every received item in the history.
+    Each array holds one column, rows line up across the arrays.
+    player holds the index of the owning Player in HistoryData.players, the first ordered_rows rows are grouped
+    by player in ascending index order and sorted by received date within each player.
+    Rows added by extend are appended after them unordered.
+    String columns hold codes into the matching pool, names for name, notes for note, timestamps for timestamp.
+    """
+    player: np.ndarray
+    item_id: np.ndarray
+    instance_id: np.ndarray
+    received: np.ndarray
+    flags: np.ndarray
+    name: np.ndarray
+    note: np.ndarray
+    timestamp: np.ndarray
+    names: List[str]
+    notes: List[str]
+    timestamps: List[str]
+    """
+    received_at strings, "" for items without a timestamp
+    """
+    ordered_rows: Optional[int] = None
+    """
+    None when every row is ordered
+    """
+    _codes: Optional[Dict[str, Dict[str, int]]] = field(default=None, repr=False, compare=False)
+    """
+    pool name -> string -> code, built on the first extend
+    """
+    _offsets: Optional[List[int]] = field(default=None, repr=False, compare=False)
+    """
+    First ordered row of every player index and one past the last, built on the first rows_of
+    """
+    _appended: Optional[Dict[int, List[int]]] = field(default=None, repr=False, compare=False)
+    """
+    player index -> rows appended by extend, in append order
+    """
+    _buffers: Optional[Dict[str, np.ndarray]] = field(default=None, repr=False, compare=False)
+    """
+    column name -> array the column is a view of, with room for more rows
+    """
+
+    columns = ("player", "item_id", "instance_id", "received", "flags", "name", "note", "timestamp")
+    pools = ("names", "notes", "timestamps")
+
+    chunk_rows = 1 << 14
+    """
+    Rows converted to arrays at a time by extend, bounding the Python objects alive at once
+    """
+
+    @classmethod
+    def from_items(cls, items: Iterable[Tuple[int, ReceivedItem]]) -> ItemStore:
+        """
+        Builds an ordered store from (player index, item) pairs, grouped by player in ascending index order
+        and sorted by date within each player. items is consumed lazily.
+        """
+        store = cls(**{column: np.zeros(0, dtype=np.int32) for column in cls.columns}, names=[], notes=[], timestamps=[])
+        store._write(items)
+        for column in cls.columns:
+            setattr(store, column, getattr(store, column).copy())  # drop the spare capacity
+        store._buffers = None
+        return store
+
+    def extend(self, items: Iterable[Tuple[int, ReceivedItem]]) -> None:
+        """
+        Appends (player index, item) pairs as new rows, adding unseen strings to the pools.
+        Columns grow with spare capacity, so the cost of an append is proportional to the rows added.
+        """
+        if self.ordered_rows is None:
+            self.ordered_rows = len(self)
+            self._appended = {}
+
+        start = len(self)
+        self._write(items)
+        for row, player in enumerate(self.player[start:].tolist(), start):
+            self._appended.setdefault(player, []).append(row)
+
+    def code(self, pool: str, value: str) -> Optional[int]:
+        """
+        The code of value in one of pools, None when no row holds it
+        """
+        return self._pool_codes()[pool].get(value)
+
+    def _pool_codes(self) -> Dict[str, Dict[str, int]]:
+        if self._codes is None:
+            self._codes = {pool: {value: code for code, value in enumerate(getattr(self, pool))} for pool in self.pools}
+        return self._codes
+
+    def _write(self, items: Iterable[Tuple[int, ReceivedItem]]) -> None:
+        self._pool_codes()
+        items = iter(items)
+        while True:
+            rows = [
+                (
+                    index,
+                    item.item_id,
+                    item.instance_id,
+                    item.received_on,
+                    item.flags,
+                    self._encode("names", item.item_name),
+                    self._encode("notes", item.officer_note),
+                    self._encode("timestamps", item.received_at or ""),
+                )
+                for index, item in itertools.islice(items, self.chunk_rows)
+            ]
+            if not rows:
+                return
+            self._append(np.array(rows, dtype=np.int32))
+
+    def _append(self, rows: np.ndarray) -> None:
+        """
+        Writes a block of rows after the current ones, doubling the column buffers when they are full.
+        """
+        start, end = len(self), len(self) + len(rows)
+        if self._buffers is None or end > len(self._buffers["player"]):
+            capacity = max(end, 2 * start, self.chunk_rows)
+            self._buffers = {column: np.empty(capacity, dtype=np.int32) for column in self.columns}
+            for column in self.columns:
+                self._buffers[column][:start] = getattr(self, column)
+
+        for i, column in enumerate(self.columns):
+            self._buffers[column][start:end] = rows[:, i]
+            setattr(self, column, self._buffers[column][:end])
+
+    def _encode(self, pool: str, value: str) -> int:
+        codes = self._codes[pool]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(codes)
+            getattr(self, pool).append(value)
+
+        return code
+
+    def in_player_order(self) -> ItemStore:
+        """
+        Returns the store with every row ordered, re-sorting rows appended by extend.
+        """
+        if self.ordered_rows is None:
+            return self
+
+        order = np.lexsort((self.received, self.player))
+        columns = {column: getattr(self, column)[order] for column in self.columns}
+        return replace(self, **columns, ordered_rows=None, _offsets=None, _appended=None, _buffers=None)
+
+    def __len__(self) -> int:
+        return len(self.player)
+
+    def rows_of(self, player_index: int) -> slice:
+        """
+        The contiguous ordered rows owned by a player
+        """
+        ordered = self.player[:self.ordered_rows]
+        if self._offsets is None or self._offsets[-1] != len(ordered):
+            self._offsets = np.concatenate([[0], np.cumsum(np.bincount(ordered))]).tolist()
+
+        last = len(self._offsets) - 1
+        return slice(self._offsets[min(player_index, last)], self._offsets[min(player_index + 1, last)])
+
+    def player_rows(self, player_index: int) -> Union[slice, np.ndarray]:
+        """
+        Every row owned by a player in received date order, including rows appended by extend
+        """
+        ordered = self.rows_of(player_index)
+        appended = self._appended.get(player_index) if self._appended else None
+        if not appended:
+            return ordered
+
+        rows = np.concatenate([np.arange(ordered.start, ordered.stop), appended])
+        return rows[np.argsort(self.received[rows], kind="stable")]
+
+    def per_player(self, mask: np.ndarray, player_count: int) -> np.ndarray:
+        """
+        Number of masked rows owned by each player, indexed like HistoryData.players
+        """
+        return np.bincount(self.player[mask], minlength=player_count)
+
+
+class ItemIndex:
+    """
+    Store rows grouped by team and instance, each group sorted by received date.
+    A query reads only the groups it selects and bisects the date window within each of them.
+    """
+
+    def __init__(self, items: ItemStore, player_teams: Sequence[str]) -> None:
+        """
+        player_teams holds the team of every player, indexed like HistoryData.players
+        """
+        team_names, player_codes = np.unique(np.asarray(player_teams, dtype=str), return_inverse=True)
+        teams = player_codes[items.player] if len(items) else np.zeros(0, dtype=np.intp)
+
+        order = np.lexsort((items.received, items.instance_id, teams))
+        keys = np.stack([teams[order], items.instance_id[order]])
+        starts = np.flatnonzero(np.any(keys[:, 1:] != keys[:, :-1], axis=0)) + 1
+        bounds = zip([0, *starts.tolist()], [*starts.tolist(), len(order)])
+
+        self.groups: Dict[str, Dict[int, Tuple[np.ndarray, np.ndarray]]] = {}
+        """
+        team name -> instance id -> (rows, received dates of those rows)
+        """
+        for start, end in bounds:
+            if start == end:
+                continue
+            rows = order[start:end]
+            team = str(team_names[teams[rows[0]]])
+            self.groups.setdefault(team, {})[int(items.instance_id[rows[0]])] = (rows, items.received[rows])
+
+    def add(self, items: ItemStore, rows: np.ndarray, player_teams: Mapping[int, str]) -> None:
+        """
+        Indexes rows appended to items since the index was built, merging them into their groups in date order.
+        player_teams maps the index of every player owning one of the rows to its team.
+        Only the groups receiving rows are re-sorted.
+        """
+        added: Dict[Tuple[str, int], List[int]] = {}
+        for row, player, instance in zip(rows.tolist(), items.player[rows].tolist(), items.instance_id[rows].tolist()):
+            added.setdefault((player_teams[player], instance), []).append(row)
+
+        for (team, instance), new_rows in added.items():
+            group = self.groups.setdefault(team, {})
+            held = group[instance][0] if instance in group else np.zeros(0, dtype=np.intp)
+            merged = np.concatenate([held, np.asarray(new_rows, dtype=np.intp)])
+            merged = merged[np.argsort(items.received[merged], kind="stable")]
+            group[instance] = (merged, items.received[merged])
+
+    def rows(
+            self,
+            team_name: str,
+            instances: Optional[Iterable[int]],
+            excluded_instances: Iterable[int],
+            since: Optional[str],
+            until: Optional[str],
+    ) -> np.ndarray:
+        """
+        Dated rows of the team received within the inclusive since / until window, either bound may be None.
+        instances=None selects every instance not in excluded_instances.
+        """
+        groups = self.groups.get(team_name, {})
+        selected = groups.keys() if instances is None else instances
+        start, end = max(to_ordinal(since), NO_DATE + 1), to_ordinal(until) if until else np.iinfo(np.int32).max
+
+        windows = []
+        for instance in selected:
+            if instance in excluded_instances or instance not in groups:
+                continue
+            rows, dates = groups[instance]
+            first, last = np.searchsorted(dates, start), np.searchsorted(dates, end, side="right")
+            windows.append(rows[first:last])
+
+        return np.concatenate(windows) if windows else np.zeros(0, dtype=np.intp)
@@ -1,7 +1,30 @@
 from __future__ import annotations
 
-from typing import Union, Any, Sequence, Dict, Tuple, List
-from collections import Hashable
+from typing import Union, Any, Sequence, Dict, Tuple, List, Iterator, Type, TextIO
+from collections import abc
+
+_row_types: Dict[Tuple[str, ...], Type[Row]] = {}
+"""
+headings -> the Row subclass shared by every row with those headings
+"""
+
+
+def _row_type(headings: Sequence[str]) -> Type[Row]:
+    headings = tuple(headings)
+    row_type = _row_types.get(headings)
+    if row_type is None:
+        namespace = {
+            "__slots__": (),
+            "_schema": Schema(headings),
+            "_index_map": {heading: index for index, heading in enumerate(headings)},
+        }
+        row_type = _row_types[headings] = type(Row.__name__, (Row,), namespace)
+
+    return row_type
+
+
+def _build_row(headings: Tuple[str, ...], values: Tuple[Any, ...]) -> Row:
+    return tuple.__new__(_row_type(headings), values)
 
 
 class Schema(tuple):
@@ -9,6 +32,13 @@ class Schema(tuple):
     Represents the table headings. Can be used to instantiate a new table
     or row with these headings.
     """
+    @property
+    def row_type(self) -> Type[Row]:
+        """
+        The Row subclass holding the index map shared by all rows with these headings
+        """
+        return _row_type(self)
+
     def build_row(self, values: Sequence[str]) -> Row:
         """
         Instantiates a new row with these headings. Cell values should
@@ -16,7 +46,7 @@ class Schema(tuple):
         """
         if len(values) != len(self):
             raise ValueError(f"Expected {len(self)} rows, got {len(values)}")
-        return Row(**{item: values[i] for i, item in enumerate(self)})
+        return tuple.__new__(self.row_type, values)
 
     def new_table(self):
         """
@@ -30,98 +60,86 @@ class Row(tuple):
     Represents a table row, is immutable and implements the mapping
     interface to allow access to the cell values using the heading names
     as keys.
+    Rows with the same headings share a Row subclass holding the schema
+    and index map, so a row stores nothing but its cells.
     """
+    __slots__ = ()
+
     _default_separator = " : "
     _default_line_end = "\n"
+    _schema: Schema = Schema()
+    _index_map: Dict[str, int] = {}
 
     def __new__(cls, **kwargs) -> Row:
-        _items = kwargs.items()
-        row = super(Row, cls).__new__(cls, (value for (_, value) in _items))
-        return row
-
-    def __init__(self, **kwargs):
-        items = kwargs.items()
-        index_map, values = (
-            {key: index for index, (key, _) in enumerate(items)},
-            tuple(value for (_, value) in items),
-        )
-        self._index_map = index_map
-        self._separator = self._default_separator
+        return tuple.__new__(_row_type(kwargs.keys()), kwargs.values())
+
+    def __reduce__(self):
+        return _build_row, (tuple(self._schema), tuple(self))
 
     def __getitem__(self, item: Union[str, int, slice]) -> Any:
-        try:
-            index = (int, slice, str).index(type(item))
-        except ValueError:
+        if isinstance(item, str):
+            try:
+                item = self._index_map[item]
+            except KeyError:
+                raise KeyError(f"No column named {item} exists")
+        elif not isinstance(item, (int, slice)):
             raise TypeError(f"A row cannot be indexed by values of type {type(item)}")
 
         try:
-            return (
-                lambda i: super(Row, self).__getitem__(i),
-                lambda i: super(Row, self).__getitem__(i),
-                lambda i: super(Row, self).__getitem__(self._index_map[i]),
-            )[
-                index
-            ](item)
-        except KeyError:
-            raise KeyError(f"No column named {item} exists")
+            return tuple.__getitem__(self, item)
         except IndexError:
             raise IndexError(f"Row index {item} out of bounds, rows are indexed from {0} to {len(self)}")
 
-    def get(self, column_key: Hashable, default=None) -> Any:
+    def get(self, column_key: abc.Hashable, default=None) -> Any:
         """
         This method is implemented identically to
         >>> dict().get(key="...", _default=None)
         """
-        if not isinstance(column_key, Hashable):
+        if not isinstance(column_key, abc.Hashable):
             raise TypeError(f"The key type supplied ({type(column_key)}) does not implement a __hash__ method")
 
         index = self._index_map.get(column_key)
         if index is not None:
-            return self[index]
+            return tuple.__getitem__(self, index)
         else:
             return default
 
     @property
     def separator(self) -> str:
-        return self._separator
-
-    @separator.setter
-    def separator(self, value: str) -> None:
-        self._separator = value
+        return self._default_separator
 
     @property
     def schema(self) -> Schema:
-        return Schema(self._index_map.keys())
+        return self._schema
 
     def items(self) -> Sequence[Tuple[str, str]]:
         """
         This method is implemented identically to
         >>> dict().items()
         """
-        return [
-            (heading, self[heading]) for heading in self._index_map.keys()
-        ]
+        return list(zip(self._schema, self))
 
     def __str__(self) -> str:
-        return str(self._separator).join([str(cell) for cell in self]) + "\n"
+        return self.separator.join([str(cell) for cell in self]) + "\n"
 
 
-class Table(list):
+class Table(abc.Sequence):
     """
-    Represents tabular data formatted as text
+    Represents tabular data formatted as text.
+    Cells are stored per column, index 0 is the headings row and rows are
+    built from the columns when accessed.
     """
-    _schema: Schema
-    _hlines: set
-
-    def __new__(cls, headings: Sequence[str]) -> Table:
-        table = super(Table, cls).__new__(cls)
-        return table
+    separator = Row._default_separator
 
     def __init__(self, headings: Sequence[str]):
-        super(Table, self).__init__()
         self._schema = Schema(headings)
+        self._row_type = self._schema.row_type
+        self._columns: List[List[Any]] = [[] for _ in self._schema]
+        self._widths: List[int] = [0] * len(self._schema)
+        """
+        Widest body cell in each column, kept up to date by append
+        """
         self._hlines = set()
-        self.append(Row(**{heading: heading for heading in headings}))
 
     def append(self, row: Union[Row, Sequence[str]]) -> Table:
         """
@@ -129,10 +147,16 @@ class Table(list):
         the table body.
         """
         if not isinstance(row, Row):
-            row = self.schema.build_row(row)
-        if row.schema != self.schema:
+            row = self._schema.build_row(row)
+        if type(row) is not self._row_type and row.schema != self._schema:
             raise ValueError(f"The row provided had an incorrect schema, expected {self._schema}, got {row.schema}")
-        super(Table, self).append(row)
+
+        widths = self._widths
+        for index, cell in enumerate(row):
+            self._columns[index].append(cell)
+            width = len(str(cell))
+            if width > widths[index]:
+                widths[index] = width
         return self
 
     def add_row(self, *args) -> Table:
@@ -141,20 +165,45 @@ class Table(list):
         >>> table.add_row('cell1', 'cell2', 'cell3')
 
         """
-        self.append(self._schema.build_row(args))
-        return self
+        return self.append(self._schema.build_row(args))
 
     @property
     def schema(self) -> Schema:
         return self._schema
 
+    def __len__(self) -> int:
+        return len(self._columns[0]) + 1 if self._columns else 1
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Row, List[Row]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"Table index {index} out of range")
+        if index == 0:
+            return tuple.__new__(self._row_type, self._schema)
+
+        return tuple.__new__(self._row_type, [column[index - 1] for column in self._columns])
+
     def __str__(self) -> str:
         return self.format(headings=True)
 
     @property
-    def columns(self) -> Dict[list]:
+    def columns(self) -> Dict[str, List[Any]]:
+        """
+        heading -> the body cells of that column. The lists are the table's own storage and must not be modified.
+        """
+        return dict(zip(self._schema, self._columns))
+
+    def column_widths(self, headings: bool = True) -> Dict[str, int]:
+        """
+        Width of each column, including the headings when headings=True
+        """
         return {
-            heading: [row[heading] for row in self.body] for heading in self.schema
+            heading: max(width, len(heading)) if headings else width
+            for heading, width in zip(self._schema, self._widths)
         }
 
     def format(self, headings: bool = True) -> str:
@@ -162,50 +211,39 @@ class Table(list):
         Returns a formatted string representation of the table.
         Set headings=True to include the headings in a row at the top.
         """
-        col_widths = self._get_column_widths(headings)
-        rows: Sequence[Row] = self.body
-        lines = self._get_formatted_rows(col_widths, rows)
-        lines = self._insert_hlines(lines)
-
-        if headings:
-            lines = self._prepend_headings(col_widths, lines)
-
-        return "\n".join(lines) + "\n"
+        return "\n".join(self.lines(headings)) + "\n"
 
-    def _get_column_widths(self, headings) -> Dict[str, int]:
-        return {
-            heading: max([len(str(cell)) for cell in column] + [len(heading)] * int(headings))
-            for heading, column in self.columns.items()
-        }
+    def lines(self, headings: bool = True) -> Iterator[str]:
+        """
+        Yields each formatted row and divider, without line ends, in a single pass over the columns.
+        """
+        widths = [*self.column_widths(headings).values()]
+        separator = self.separator
 
-    def _prepend_headings(self, col_widths, lines: List[str]) -> List[str]:
-        justified_cells = [str(cell).ljust(col_widths[heading]) for heading, cell in self[0].items()]
-        lines = [self[0].separator.join(justified_cells)] + [*lines]
-        return lines
-
-    def _get_formatted_rows(self, col_widths: Dict[str, int], rows: Sequence[Row]) -> List[str]:
-        lines = [
-            row.separator.join(
-                [
-                    str(cell).ljust(col_widths[heading])
-                    for heading, cell in row.items()
-                ]
-            )
-            for row in rows
-        ]
-        return lines
-
-    def _insert_hlines(self, lines: List[str]) -> List[str]:
-        for row_index in self._hlines:
-            if row_index == -1:
-                lines[0] = "-" * len(lines[0]) + "\n" + lines[0]
-            else:
-                lines[row_index] += "\n" + "-" * len(lines[row_index])
-        return lines
+        if headings:
+            yield format_cells(self._schema, widths, separator)
+
+        hlines = self._hlines
+        for index, cells in enumerate(zip(*self._columns)):
+            line = format_cells(cells, widths, separator)
+            if index == 0 and -1 in hlines:
+                yield "-" * len(line)
+            yield line
+            if index in hlines:
+                yield "-" * len(line)
+
+    def write_to(self, fp: TextIO, headings: bool = True) -> None:
+        """
+        Writes the formatted table to a text file line by line, the same text as format()
+        without building it as one string.
+        """
+        for line in self.lines(headings):
+            fp.write(line)
+            fp.write("\n")
 
     @property
     def body(self) -> Sequence[Row]:
-        return tuple(self[1:])
+        return TableBody(self)
 
     def hline(self) -> None:
         """
@@ -213,5 +251,97 @@ class Table(list):
         If called before any rows are appended, it will appear under
         the headings.
         """
-        self._hlines.add(len(self.body) - 1)
+        self._hlines.add(len(self) - 2)
+
+
+class TableWriter:
+    """
+    Formats rows straight to a text file as they are added, nothing is kept in memory.
+    Column widths are fixed up front, so a single pass over the data is enough:
+
+    >>> writer = TableWriter(logfile, schema, widths)
+    >>> writer.add_row('cell1', 'cell2', 'cell3')
+
+    Writes the same text as Table.write_to for a table whose widest cells match widths.
+    Cells wider than their column are written in full and push the rest of the row out of line.
+    """
+    separator = Table.separator
+
+    def __init__(self, fp: TextIO, headings: Sequence[str], widths: Sequence[int], write_headings: bool = True):
+        """
+        widths holds the widest cell in each column, the headings are accounted for when written.
+        """
+        self._fp = fp
+        self._schema = Schema(headings)
+        if len(widths) != len(self._schema):
+            raise ValueError(f"Expected {len(self._schema)} column widths, got {len(widths)}")
+        if write_headings:
+            self._widths = [max(width, len(heading)) for heading, width in zip(self._schema, widths)]
+        else:
+            self._widths = [*widths]
+        self._rows = 0
+        self._last_width = 0
+        self._top_divider = False
+        self._divided_rows = -1
+        """
+        Row count when the last divider was written, repeated hlines insert one divider
+        """
+
+        if write_headings:
+            self._write(format_cells(self._schema, self._widths, self.separator))
+
+    def _write(self, line: str) -> None:
+        self._fp.write(line)
+        self._fp.write("\n")
+
+    def append(self, row: Union[Row, Sequence[str]]) -> TableWriter:
+        if len(row) != len(self._schema):
+            raise ValueError(f"Expected {len(self._schema)} cells, got {len(row)}")
+
+        line = format_cells(row, self._widths, self.separator)
+        if self._top_divider:
+            self._write("-" * len(line))
+            self._top_divider = False
+        self._write(line)
+        self._rows += 1
+        self._last_width = len(line)
+        return self
+
+    def add_row(self, *args) -> TableWriter:
+        return self.append(args)
+
+    def hline(self) -> None:
+        """
+        Inserts a horizontal divider after the last added row.
+        If called before any rows are added, it is written under the headings once the first row follows.
+        """
+        if not self._rows:
+            self._top_divider = True
+        elif self._divided_rows != self._rows:
+            self._write("-" * self._last_width)
+            self._divided_rows = self._rows
+
+
+def format_cells(cells: Sequence[Any], widths: Sequence[int], separator: str) -> str:
+    return separator.join([str(cell).ljust(width) for cell, width in zip(cells, widths)])
+
+
+class TableBody(abc.Sequence):
+    """
+    The rows of a table after the headings, read from the table without copying
+    """
+    def __init__(self, table: Table):
+        self._table = table
+
+    def __len__(self) -> int:
+        return len(self._table) - 1
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Row, List[Row]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
 
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"Table body index {index} out of range")
+        return self._table[index + 1]
@@ -1,6 +1,7 @@
+from io import StringIO
 from unittest import TestCase
 
-from table.table import Row, Schema, Table
+from table.table import Row, Schema, Table, TableWriter
 
 
 class RowTest(TestCase):
@@ -98,3 +99,61 @@ class TableTest(TestCase):
             for i in range(len(table.body[j])):
                 cell = table.body[j][table.schema[i]]
                 assert cell == f"value_{i}_{j}", f"{cell}, i={i}, j={j}"
+
+    def test_rows_share_schema(self):
+        table = Table(self.row_headings)
+        for row in self.rows:
+            table.append(row)
+
+        assert type(table[1]) is type(table[2]) is type(table.schema.build_row(self.rows[0]))
+        assert not hasattr(table[1], "__dict__")
+        assert table[1]["column_2"] == "value_2_0"
+
+    def test_column_widths(self):
+        table = Table(["a", "long heading"]).add_row("wide cell", 1).add_row("x", 12345)
+
+        assert table.column_widths(headings=True) == {"a": 9, "long heading": 12}
+        assert table.column_widths(headings=False) == {"a": 9, "long heading": 5}
+        assert table.columns == {"a": ["wide cell", "x"], "long heading": [1, 12345]}
+
+    def test_format(self):
+        table = Table(["a", "b"])
+        table.hline()
+        table.add_row("x", "yy")
+        table.hline()
+        table.add_row("long", "z")
+
+        assert table.format(headings=True) == "a    : b \n---------\nx    : yy\n---------\nlong : z \n"
+        assert table.format(headings=False) == "---------\nx    : yy\n---------\nlong : z \n"
+
+    def test_write_to(self):
+        table = Table(self.row_headings)
+        for row in self.rows:
+            table.append(row)
+            table.hline()
+
+        log = StringIO()
+        table.write_to(log)
+
+        assert log.getvalue() == table.format(headings=True)
+        assert [*table.lines(headings=False)] == table.format(headings=False).splitlines()
+
+
+class TableWriterTest(TestCase):
+    def test_matches_table(self):
+        table = Table(["a", "b"])
+        log = StringIO()
+        writer = TableWriter(log, ["a", "b"], [4, 2])
+        for target in (table, writer):
+            target.hline()
+            target.add_row("x", "yy")
+            target.hline()
+            target.hline()
+            target.add_row("long", "z")
+            target.hline()
+
+        assert log.getvalue() == table.format(headings=True)
+
+    def test_width_count(self):
+        with self.assertRaises(ValueError):
+            TableWriter(StringIO(), ["a", "b"], [1])
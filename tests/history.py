@@ -0,0 +1,56 @@
+"""
+Small ThatsMyBis shaped exports shared by the tests.
+"""
+import copy
+from typing import List, Optional
+
+team_a = "Team A"
+team_b = "Team B"
+
+
+def item(
+        item_id: int,
+        name: str,
+        received_at: Optional[str],
+        officer_note: Optional[str] = "",
+        instance_id: int = 12,
+        is_offspec: bool = False,
+) -> dict:
+    return {
+        "item_id": item_id,
+        "name": name,
+        "instance_id": instance_id,
+        "pivot": {"is_offspec": is_offspec, "officer_note": officer_note, "received_at": received_at},
+    }
+
+
+def player(player_id: int, name: str, team: str, role: str, received: List[dict]) -> dict:
+    return {"id": player_id, "name": name, "raid_group_name": team, "class": role, "received": received}
+
+
+_history = [
+    player(1, "Alpha", team_a, "Warrior", [
+        item(101, "Helm of Testing", "2021-08-03 20:10:00"),
+        item(102, "Pattern: Test Robe", "2021-08-03 20:20:00"),
+        item(103, "Old Gruul Ring", "2021-07-20 20:00:00", instance_id=10),
+        item(104, "Banked Cloak", "2021-08-10 21:00:00", officer_note="Banking"),
+        item(105, "Undated Trinket", None),
+    ]),
+    player(2, "Bravo", team_a, "Priest", [
+        item(201, "Staff of Testing", "2021-08-10 20:30:00"),
+        item(202, "Offspec Boots", "2021-08-17 20:30:00", officer_note="OS", is_offspec=True),
+        item(203, "Gloves of Testing", "2021-08-17 21:00:00", officer_note=None, instance_id=14),
+    ]),
+    player(3, "Charlie", team_b, "Mage", [
+        item(301, "Wand of Testing", "2021-08-04 20:00:00"),
+        item(302, "PvP Bracers", "2021-08-11 20:00:00", officer_note="PvP"),
+    ]),
+    player(4, "Delta", team_b, "Rogue", []),
+]
+
+
+def history() -> List[dict]:
+    """
+    A fresh copy of a two team export, safe to modify
+    """
+    return copy.deepcopy(_history)
@@ -0,0 +1,105 @@
+from unittest import TestCase
+
+from aggregate_cache import AggregateCache
+from config import Config
+from ledger import Ledger, LootQuery
+from tests.history import history, item, team_a
+
+
+class AggregateCacheTest(TestCase):
+    @staticmethod
+    def key(name: str):
+        return team_a, name, "dataset"
+
+    def test_hit_and_miss(self):
+        cache = AggregateCache(4)
+        calls = []
+
+        for _ in range(3):
+            assert cache.get(self.key("a"), lambda: calls.append(1) or "value") == "value"
+
+        assert len(calls) == 1
+        assert cache.stats == {"hits": 2, "misses": 1, "size": 1, "max_size": 4}
+
+    def test_evicts_least_recently_used(self):
+        cache = AggregateCache(2)
+        cache.get(self.key("a"), lambda: "a")
+        cache.get(self.key("b"), lambda: "b")
+        cache.get(self.key("a"), lambda: "a")
+        cache.get(self.key("c"), lambda: "c")
+
+        assert len(cache) == 2
+        assert cache.get(self.key("a"), lambda: "recomputed") == "a"
+        assert cache.get(self.key("b"), lambda: "recomputed") == "recomputed"
+
+    def test_zero_size_disables_caching(self):
+        cache = AggregateCache(0)
+
+        assert cache.get(self.key("a"), lambda: 1) == 1
+        assert cache.get(self.key("a"), lambda: 2) == 2
+        assert len(cache) == 0
+        assert cache.stats["misses"] == 2
+
+    def test_clear_keeps_counters(self):
+        cache = AggregateCache(4)
+        cache.get(self.key("a"), lambda: "a")
+        cache.get(self.key("a"), lambda: "a")
+        cache.clear()
+
+        assert len(cache) == 0
+        assert cache.stats["hits"] == 1 and cache.stats["misses"] == 1
+        assert cache.get(self.key("a"), lambda: "recomputed") == "recomputed"
+
+    def test_value_computed_across_clear_is_dropped(self):
+        cache = AggregateCache(4)
+
+        def compute():
+            cache.clear()
+            return "stale"
+
+        assert cache.get(self.key("a"), compute) == "stale"
+        assert len(cache) == 0
+        assert cache.get(self.key("a"), lambda: "fresh") == "fresh"
+
+
+class LedgerAggregatesTest(TestCase):
+    def setUp(self):
+        self.style_choice = Config.style_choice
+        Config.style_choice = "default"
+        self.ledger = Ledger(history(), cache_size=8)
+        self.query = LootQuery(team_a)
+
+    def tearDown(self):
+        Config.style_choice = self.style_choice
+
+    def test_repeated_query_hits(self):
+        first = self.ledger.query(self.query)
+
+        assert self.ledger.query(self.query) is first
+        assert self.ledger.aggregates.stats["hits"] >= 1
+
+    def test_query_after_ingest_misses(self):
+        before = dict(self.ledger.query(self.query))
+        export = history()
+        export[0]["received"].append(item(106, "New Helm", "2021-08-24 20:00:00"))
+        misses = self.ledger.aggregates.stats["misses"]
+
+        self.ledger.ingest(export)
+        after = dict(self.ledger.query(self.query))
+
+        assert self.ledger.aggregates.stats["misses"] > misses
+        assert after["Alpha"] == before["Alpha"] + 1
+
+    def test_ingest_without_changes_keeps_aggregates(self):
+        self.ledger.query(self.query)
+        size = len(self.ledger.aggregates)
+
+        self.ledger.ingest(history())
+        assert len(self.ledger.aggregates) == size
+
+    def test_split_teams_clears(self):
+        self.ledger.query(self.query)
+        assert len(self.ledger.aggregates)
+
+        self.ledger.split_teams()
+        assert len(self.ledger.aggregates) == 0
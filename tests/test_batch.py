@@ -0,0 +1,48 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+from batch import BatchJob, parse_args
+
+
+class ParseArgsTest(TestCase):
+    def error(self, args) -> str:
+        stderr = io.StringIO()
+        with self.assertRaises(SystemExit), contextlib.redirect_stderr(stderr):
+            parse_args(args)
+        return stderr.getvalue()
+
+    def job_file_error(self, jobs) -> str:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "jobs.json")
+            with open(path, "w") as job_file:
+                json.dump(jobs, job_file)
+            return self.error(["--job-file", path])
+
+    def test_single_job(self):
+        jobs, render_jobs = parse_args(["X", "--since", "20210701", "--chart", "combined", "--render-jobs", "2"])
+
+        assert jobs == [BatchJob(teams=["X"], since="20210701", charts=("combined",))]
+        assert render_jobs == 2
+
+    def test_malformed_dates(self):
+        assert "since: " in self.error(["X", "--since", "2021"])
+        assert "until: " in self.error(["X", "--until", "20211301"])
+        assert "until: " in self.job_file_error([{"teams": ["X"], "until": "2021-09"}])
+
+    def test_unknown_charts_and_fields(self):
+        assert "Unknown chart 'bars'" in self.job_file_error([{"teams": ["X"], "charts": ["bars"]}])
+        assert "job 2" in self.job_file_error([{"teams": ["X"]}, {"teams": ["Y"], "colour": "red"}])
+
+    def test_unknown_style(self):
+        assert "Unknown style 'dark'" in self.error(["X", "--style", "dark"])
+        assert "Unknown style 'dark'" in self.job_file_error([{"teams": ["X"], "style": "dark"}])
+
+    def test_empty_job_file(self):
+        assert "holds no jobs" in self.job_file_error([])
+
+    def test_unreadable_job_file(self):
+        assert "cannot read --job-file" in self.error(["--job-file", "missing-jobs.json"])
@@ -0,0 +1,68 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+import plots
+from chart_cache import ChartCache
+from config import Config
+from ledger import LootTimeline
+
+
+class LootOverTimeCacheTest(TestCase):
+    names = ["Alpha", "Bravo", "Charlie"]
+    dates = ["2021-08-03", "2021-08-10"]
+
+    def setUp(self):
+        self.config = {key: getattr(Config, key) for key in ("style_choice", "charts_dir")}
+        self.directory = tempfile.TemporaryDirectory()
+        Config.style_choice = "default"
+        Config.charts_dir = self.directory.name
+
+        self.cache = ChartCache(self.directory.name)
+        chart = self.chart(self.dates, [[1, 0], [0, 2], [1, 1]])
+        for path in chart.outputs():
+            open(path, "w").close()
+        self.cache.record([chart])
+
+    def tearDown(self):
+        for key, value in self.config.items():
+            setattr(Config, key, value)
+        self.directory.cleanup()
+
+    def chart(self, dates, counts) -> plots.LootOverTime:
+        chart = plots.LootOverTime(LootTimeline(names=self.names, dates=dates, counts=np.array(counts)))
+        chart.team_id = "Team A"
+        return chart
+
+    def stale_names(self, chart: plots.LootOverTime):
+        return [name for stale in self.cache.stale([chart]) for name in stale.timeline.names]
+
+    def test_unchanged_is_skipped(self):
+        assert self.stale_names(self.chart(self.dates, [[1, 0], [0, 2], [1, 1]])) == []
+
+    def test_loot_on_a_charted_date_renders_that_player(self):
+        assert self.stale_names(self.chart(self.dates, [[1, 0], [0, 3], [1, 1]])) == ["Bravo"]
+
+    def test_new_raid_date_renders_every_player(self):
+        chart = self.chart([*self.dates, "2021-08-17"], [[1, 0, 0], [0, 2, 1], [1, 1, 0]])
+
+        assert self.stale_names(chart) == self.names
+
+    def test_style_change_renders_every_player(self):
+        Config.style_choice = "other"
+
+        assert self.stale_names(self.chart(self.dates, [[1, 0], [0, 2], [1, 1]])) == self.names
+
+    def test_missing_file_is_rendered(self):
+        os.remove(os.path.join(self.directory.name, "Charlie-loot-over-time.png"))
+
+        assert self.stale_names(self.chart(self.dates, [[1, 0], [0, 2], [1, 1]])) == ["Charlie"]
+
+    def test_manifest_round_trip(self):
+        self.cache.save()
+
+        cache = ChartCache(self.directory.name)
+        assert cache.entries == self.cache.entries
+        assert cache.stale([self.chart(self.dates, [[1, 0], [0, 2], [1, 1]])]) == []
@@ -0,0 +1,57 @@
+import random
+from unittest import TestCase
+
+from classifier import Classifier, ItemFlag
+from config import Config
+
+
+def substring_flags(officer_note: str, item_name: str, is_offspec: bool, excluded_officer_note) -> int:
+    """
+    The substring predicates ReceivedItem used before items were classified once at parse time
+    """
+    rules = {
+        ItemFlag.MAINSPEC: "Mainspec BIS" in officer_note or "Best in Slot" in officer_note,
+        ItemFlag.UPGRADE: "Upgrade" in officer_note,
+        ItemFlag.BANKED: "Banking" in officer_note,
+        ItemFlag.PVP: "PvP" in officer_note or "OSPvP" in officer_note,
+        ItemFlag.OTHER: "Other" in officer_note,
+        ItemFlag.PATTERN_OR_PLAN: "Pattern" in item_name or "Plan" in item_name,
+        ItemFlag.EXCLUDED: any(exclusion in officer_note for exclusion in excluded_officer_note),
+        ItemFlag.OFFSPEC: is_offspec,
+    }
+    return sum(int(flag) for flag, matched in rules.items() if matched)
+
+
+class ClassifierTest(TestCase):
+    fragments = [
+        "Mainspec BIS", "Best in Slot", "Upgrade", "Banking", "PvP", "OSPvP", "OS", "Other", "Pass", "Pattern", "Plan",
+        "Mainspec", "BIS", "Bank", "Pv", "OSP", "SPvP", "Oth", "os", "pvp", "Pas", "Plans", " ", ", ", "-", "x", "",
+    ]
+
+    def random_text(self, rng: random.Random) -> str:
+        return "".join(rng.choice(self.fragments) for _ in range(rng.randint(0, 4)))
+
+    def test_matches_substring_rules(self):
+        rng = random.Random(3)
+        for excluded_officer_note in (Config.excluded_officer_note, (), ("OSPvP",), ("OS", "Bank", "Banking", "S")):
+            classifier = Classifier(excluded_officer_note)
+            for _ in range(20000):
+                note, name, is_offspec = self.random_text(rng), self.random_text(rng), rng.random() < 0.5
+                expected = substring_flags(note, name, is_offspec, excluded_officer_note)
+                assert classifier.classify(note, name, is_offspec) == expected, (note, name, excluded_officer_note)
+
+    def test_overlapping_terms(self):
+        classifier = Classifier(("OS", "OSPvP"))
+
+        assert classifier.classify("OSPvP", "", False) == ItemFlag.PVP | ItemFlag.EXCLUDED
+        assert classifier.classify("OS", "", False) == ItemFlag.EXCLUDED
+        assert classifier.classify("PvP", "", False) == ItemFlag.PVP
+        assert Classifier(("OSPvP",)).classify("OS PvP", "", False) == ItemFlag.PVP
+        assert Classifier(("OS",)).classify("OSPvP", "", False) == ItemFlag.PVP | ItemFlag.EXCLUDED
+
+    def test_repeated_calls(self):
+        classifier = Classifier(Config.excluded_officer_note)
+        first = classifier.classify("Upgrade, Banking", "Plans: Test", True)
+
+        assert classifier.classify("Upgrade, Banking", "Plans: Test", True) == first
+        assert classifier.classify("Upgrade, Banking", "Plans: Test", False) == first & ~ItemFlag.OFFSPEC
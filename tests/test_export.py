@@ -0,0 +1,119 @@
+import csv
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+import export
+from config import Config
+from ledger import Ledger, LootQuery
+from table.table import Table
+from tests.history import history, team_a
+
+
+class ExportTest(TestCase):
+    def setUp(self):
+        self.style_choice = Config.style_choice
+        Config.style_choice = "default"
+        self.ledger = Ledger(history())
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        Config.style_choice = self.style_choice
+        self.directory.cleanup()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory.name, name)
+
+    @staticmethod
+    def rows(columns: export.Columns) -> list:
+        return [*zip(*(export._to_list(values) for values in columns.values()))]
+
+    def test_item_records(self):
+        columns = export.item_records(self.ledger)
+
+        assert [*columns] == [
+            "player_id", "player_name", "team", "item_id", "item_name", "instance_id", "received_at", "officer_note",
+            "flags",
+        ]
+        assert self.rows(columns) == [
+            (player.id, player.name, player.raid_group_name, item.item_id, item.item_name, item.instance_id,
+             item.received_at or "", item.officer_note, item.flags)
+            for player in self.ledger.history.players for item in player.received
+        ]
+        assert ("Alpha", "Undated Trinket", "") in {(row[1], row[4], row[6]) for row in self.rows(columns)}
+
+    def test_query_selects_dated_items(self):
+        query = LootQuery(team_a, excluded_instances=(), exclude=0)
+        rows = self.rows(export.item_records(self.ledger, query))
+        members = self.ledger.teams[team_a]
+
+        assert [row[3] for row in rows] == [
+            item.item_id for player in members for item in player.received if item.received_at
+        ]
+
+    def test_player_records(self):
+        columns = export.player_records(self.ledger, team_a)
+
+        assert self.rows(columns) == [(1, "Alpha", "Warrior", 5, 1), (2, "Bravo", "Priest", 3, 2)]
+
+    def test_csv_round_trip(self):
+        columns = export.item_records(self.ledger)
+        export.write(columns, self.path("items.csv"))
+
+        with open(self.path("items.csv"), newline="", encoding="utf-8") as fp:
+            header, *rows = [*csv.reader(fp)]
+
+        assert header == [*columns]
+        assert rows == [[str(value) for value in row] for row in self.rows(columns)]
+
+    def test_jsonl_round_trip(self):
+        columns = export.item_records(self.ledger)
+        export.write(columns, self.path("items.jsonl"))
+
+        with open(self.path("items.jsonl"), encoding="utf-8") as fp:
+            records = [json.loads(line) for line in fp]
+
+        assert records == [dict(zip(columns, row)) for row in self.rows(columns)]
+
+    def test_npz_round_trip(self):
+        columns = export.item_records(self.ledger)
+        export.write(columns, self.path("items.npz"))
+
+        with np.load(self.path("items.npz")) as archive:
+            for name, values in columns.items():
+                if f"{name}.values" in archive:
+                    decoded = archive[f"{name}.values"][archive[name]].tolist()
+                else:
+                    decoded = archive[name].tolist()
+                assert decoded == export._to_list(values), name
+
+    def test_chunked_writes(self):
+        columns = export.item_records(self.ledger)
+        chunk_rows, export.chunk_rows = export.chunk_rows, 2
+        try:
+            export.write(columns, self.path("items.jsonl"))
+        finally:
+            export.chunk_rows = chunk_rows
+
+        with open(self.path("items.jsonl"), encoding="utf-8") as fp:
+            assert [json.loads(line) for line in fp] == [dict(zip(columns, row)) for row in self.rows(columns)]
+
+    def test_table_columns(self):
+        table = Table(["Player Name", "Item Name", "Item Count"])
+        table.add_row("Alpha", "Helm, of Testing", "1")
+        table.add_row("Bravo", 'Staff "of" Testing', "2")
+        export.write(table.columns, self.path("table.csv"))
+
+        with open(self.path("table.csv"), newline="", encoding="utf-8") as fp:
+            assert [*csv.reader(fp)] == [
+                ["Player Name", "Item Name", "Item Count"],
+                ["Alpha", "Helm, of Testing", "1"],
+                ["Bravo", 'Staff "of" Testing', "2"],
+            ]
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            export.write(export.item_records(self.ledger), self.path("items.xlsx"))
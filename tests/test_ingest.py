@@ -0,0 +1,68 @@
+import io
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+from ingest import ArrayStream, iter_players
+from tests.history import history, team_b
+
+
+class ArrayStreamTest(TestCase):
+    documents = [
+        "[]",
+        "  [ \n ]  ",
+        "[1]",
+        "[1, 22, 333, -4444, 5.5e10, 0.000123]",
+        '["]", ",", "[,]", "\\"]\\"", "a\\\\", "\\u005d"]',
+        '[{"name": "Ring, of ]Brackets[", "note": "OS, PvP"}, {"nested": [[1, 2], [], {"a": []}]}]',
+        '[true, false, null, "", {}, []]',
+        '[\n  {"id": 12345678901234567890},\n  12345678901234567890\n]\n',
+    ]
+
+    @staticmethod
+    def decode(text: str, chunk_size: int) -> list:
+        return [*ArrayStream(io.StringIO(text), chunk_size)]
+
+    def test_matches_json(self):
+        for text in self.documents:
+            for chunk_size in (1, 2, 3, 7, 1 << 16):
+                assert self.decode(text, chunk_size) == json.loads(text), (text, chunk_size)
+
+    def test_numbers_cut_at_chunk_boundary(self):
+        text = json.dumps([10 ** digits for digits in range(1, 30)])
+
+        for chunk_size in range(1, 12):
+            assert self.decode(text, chunk_size) == json.loads(text)
+
+    def test_export(self):
+        text = json.dumps(history(), indent=2)
+
+        for chunk_size in (1, 5, 64):
+            assert self.decode(text, chunk_size) == history()
+
+    def test_malformed(self):
+        documents = ["", "   ", "{}", "1", "[", "[1", "[1,", "[1,]", "[1 2]", '["open]', "[{]", "[1,,2]", "[tru]"]
+
+        for text in documents:
+            for chunk_size in (1, 3, 1 << 16):
+                with self.assertRaises(ValueError, msg=(text, chunk_size)):
+                    self.decode(text, chunk_size)
+
+
+class IterPlayersTest(TestCase):
+    def test_filters_and_trims(self):
+        export = history()
+        export[0]["extra"] = {"large": ["unused"]}
+        export[0]["received"][0]["pivot"]["created_at"] = "unused"
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "character-json.json")
+            with open(path, "w") as fp:
+                json.dump(export, fp)
+
+            players = [*iter_players(path, chunk_size=7)]
+            team = [*iter_players(path, teams={team_b})]
+
+        assert players == history()
+        assert [player["name"] for player in team] == ["Charlie", "Delta"]
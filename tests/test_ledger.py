@@ -0,0 +1,281 @@
+import os
+import random
+import tempfile
+from unittest import TestCase, mock
+
+import numpy as np
+
+import snapshot
+from benchmarks.synthetic import HistorySpec, generate
+from classifier import ItemFlag
+from config import Config
+from ledger import Ledger, LootQuery, ReceivedItem
+from styles import Style
+from tests.history import history, item, player, team_a, team_b
+from tests.test_classifier import substring_flags
+
+
+class LedgerTestCase(TestCase):
+    def setUp(self):
+        self.config = {key: getattr(Config, key) for key in ("style_choice", "date_filter", "date_until")}
+        Config.style_choice = "default"
+        Config.date_filter = Config.date_until = None
+
+    def tearDown(self):
+        for key, value in self.config.items():
+            setattr(Config, key, value)
+
+    @staticmethod
+    def summary(ledger: Ledger) -> dict:
+        """
+        Everything a run reads from the ledger, for comparing a ledger with one parsed from scratch
+        """
+        return {
+            team: {
+                "members": [member.name for member in members],
+                "dataset": sorted(ledger.get_main_spec_dataset(team)),
+                "listing": ledger.loot_listing(team),
+                "received": {
+                    member.name: [(item.item_id, item.received_at) for item in member.received] for member in members
+                },
+            }
+            for team, members in sorted(ledger.teams.items())
+        }
+
+
+class IngestTest(LedgerTestCase):
+    def assert_matches_parse(self, ledger: Ledger, export: list):
+        assert self.summary(ledger) == self.summary(Ledger(export))
+
+    def test_same_export_adds_nothing(self):
+        ledger = Ledger(history())
+        before = self.summary(ledger)
+
+        assert ledger.ingest(history()) == 0
+        assert self.summary(ledger) == before
+
+    def test_ingest_keeps_items_released(self):
+        ledger = Ledger(history())
+        export = history()
+        export[0]["received"].append(item(106, "New Helm", "2021-08-24 20:00:00"))
+
+        assert ledger.ingest(export) == 1
+        assert all(member._received is None for member in ledger.history.players)
+
+    def test_duplicates_within_an_export(self):
+        ledger = Ledger(history())
+        export = history()
+        new_item = item(106, "New Helm", "2021-08-24 20:00:00")
+        export[0]["received"] += [new_item, dict(new_item)]
+
+        assert ledger.ingest(export) == 1
+        assert ledger.ingest(export) == 0
+        export[0]["received"].pop()
+        self.assert_matches_parse(ledger, export)
+
+    def test_undated_items_are_deduplicated(self):
+        ledger = Ledger(history())
+        export = history()
+        export[0]["received"].append(item(107, "Undated Ring", None))
+
+        assert ledger.ingest(export) == 1
+        assert ledger.ingest(export) == 0
+
+    def test_new_items_update_a_built_index(self):
+        ledger = Ledger(history())
+        ledger.get_main_spec_dataset(team_a)
+        assert ledger._index is not None
+
+        export = history()
+        export[1]["received"] += [
+            item(204, "Early Belt", "2021-08-01 20:00:00"),
+            item(205, "Late Belt", "2021-08-31 20:00:00", instance_id=15),
+        ]
+        ledger.ingest(export)
+
+        self.assert_matches_parse(ledger, export)
+        query = LootQuery(team_a, since="20210801", instances=None, excluded_instances=())
+        parsed = Ledger(export)
+        assert sorted(ledger.history.items.item_id[ledger.query_rows(query)].tolist()) == sorted(
+            parsed.history.items.item_id[parsed.query_rows(query)].tolist()
+        )
+
+    def test_delta_export(self):
+        ledger = Ledger(history())
+        delta = [player(3, "Charlie", team_b, "Mage", [item(303, "Robe of Testing", "2021-08-25 20:00:00")])]
+
+        assert ledger.ingest(delta) == 1
+        export = history()
+        export[2]["received"].append(delta[0]["received"][0])
+        self.assert_matches_parse(ledger, export)
+
+    def test_new_player(self):
+        ledger = Ledger(history())
+        ledger.get_main_spec_dataset(team_b)
+        export = [*history(), player(5, "Echo", team_b, "Druid", [item(501, "Idol of Testing", "2021-08-24 20:00:00")])]
+
+        assert ledger.ingest(export) == 1
+        assert "Echo" in ledger.members[team_b]
+        assert dict(ledger.get_main_spec_dataset(team_b))["Echo"] == 1
+        self.assert_matches_parse(ledger, export)
+
+    def test_new_player_without_items(self):
+        ledger = Ledger(history())
+        ledger.get_main_spec_dataset(team_a)
+        export = [*history(), player(5, "Echo", team_a, "Druid", [])]
+
+        assert ledger.ingest(export) == 0
+        assert dict(ledger.get_main_spec_dataset(team_a))["Echo"] == 0
+
+    def test_raid_group_move(self):
+        ledger = Ledger(history())
+        ledger.get_main_spec_dataset(team_a)
+        export = history()
+        export[1]["raid_group_name"] = team_b
+
+        assert ledger.ingest(export) == 0
+        assert "Bravo" not in ledger.members[team_a]
+        assert "Bravo" in ledger.members[team_b]
+        self.assert_matches_parse(ledger, export)
+
+    def test_ingest_into_snapshot(self):
+        export = history()
+        export[0]["received"].append(item(106, "New Helm", "2021-08-24 20:00:00"))
+
+        with tempfile.TemporaryDirectory() as directory:
+            snapshot.save(Ledger(history()).history, {"key": 1}, os.path.join(directory, "ledger"))
+            loaded = snapshot.load({"key": 1}, os.path.join(directory, "ledger"))
+            assert isinstance(loaded.items.item_id, np.memmap)
+
+            ledger = Ledger(loaded)
+            ledger.get_main_spec_dataset(team_a)
+            assert ledger.ingest(export) == 1
+            assert ledger.ingest(export) == 0
+            self.assert_matches_parse(ledger, export)
+
+
+class RoleColorTest(LedgerTestCase):
+    def test_colors_indexed_by_team(self):
+        ledger = Ledger(history())
+        colors = Style.role_colors["default"]
+
+        assert ledger.role_colors == {
+            team_a: {"Alpha": colors["Warrior"], "Bravo": colors["Priest"]},
+            team_b: {"Charlie": colors["Mage"], "Delta": colors["Rogue"]},
+        }
+        dataset = ledger.get_main_spec_dataset(team_a)
+        assert ledger.sequence_role_colors(dataset, team_a) == [colors["Priest"], colors["Warrior"]]
+
+    def test_restyle(self):
+        ledger = Ledger(history())
+        alternate = {role: f"alternate {color}" for role, color in Style.role_colors["default"].items()}
+
+        with mock.patch.dict(Style.role_colors, {"alternate": alternate}):
+            Config.style_choice = "alternate"
+            ledger.assign_role_colors()
+
+        assert ledger.role_colors[team_a] == {"Alpha": alternate["Warrior"], "Bravo": alternate["Priest"]}
+        assert ledger.members[team_b]["Delta"].role_color == alternate["Rogue"]
+
+
+class MainSpecReceivedTest(LedgerTestCase):
+    def test_exclusions_are_fixed_at_parse(self):
+        excluded_officer_note = Config.excluded_officer_note
+        try:
+            alpha = Ledger(history()).members[team_a]["Alpha"]
+            names = [item.item_name for item in alpha.main_spec_received]
+
+            Config.excluded_officer_note = ()
+            assert [item.item_name for item in alpha.main_spec_received] == names == ["Helm of Testing"]
+            assert [item.item_name for item in Ledger(history()).members[team_a]["Alpha"].main_spec_received] == [
+                "Helm of Testing", "Banked Cloak",
+            ]
+        finally:
+            Config.excluded_officer_note = excluded_officer_note
+
+    def test_date_window(self):
+        alpha = Ledger(history()).members[team_a]["Alpha"]
+
+        Config.date_filter = "20210804"
+        assert alpha.main_spec_received == []
+        Config.date_filter = "20210803"
+        assert [item.item_id for item in alpha.main_spec_received] == [101]
+        Config.date_until = "20210802"
+        assert alpha.main_spec_received == []
+
+
+class QueryTest(LedgerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.ledger = Ledger(generate(HistorySpec(players=60, items_per_player=30, seed=7)))
+        self.dates = sorted({
+            item.received_at[:10].replace("-", "")
+            for member in self.ledger.history.players for item in member.received if item.received_at
+        })
+
+    def random_date(self, rng: random.Random):
+        return rng.choice([None, *self.dates, "20200101", "20300101"])
+
+    @staticmethod
+    def counted(item: ReceivedItem, query: LootQuery) -> bool:
+        """
+        Whether a query counts an item, decided from the item's strings without the store, index or flags
+        """
+        if not item.received_at:
+            return False
+        date = item.received_at[:10].replace("-", "")
+        if query.since and date < query.since or query.until and date > query.until:
+            return False
+        if item.instance_id in query.excluded_instances:
+            return False
+        if query.instances is not None and item.instance_id not in query.instances:
+            return False
+
+        flags = substring_flags(item.officer_note, item.item_name, item.is_offspec, Config.excluded_officer_note)
+        return (not query.include or bool(flags & query.include)) and not flags & query.exclude
+
+    def brute_force(self, query: LootQuery) -> dict:
+        return {
+            member.name: sum(self.counted(item, query) for item in member.received)
+            for member in self.ledger.teams[query.team]
+        }
+
+    def test_query_matches_brute_force(self):
+        rng = random.Random(11)
+        flags = [0, *ItemFlag]
+        for _ in range(200):
+            since, until = self.random_date(rng), self.random_date(rng)
+            query = LootQuery(
+                team=rng.choice([*self.ledger.teams]),
+                since=since,
+                until=until,
+                instances=rng.choice([None, {12}, {10, 14}, {11, 12, 14}]),
+                excluded_instances=rng.choice([(10, 11), (), (14,)]),
+                include=rng.choice(flags) | rng.choice(flags),
+                exclude=rng.choice([ItemFlag.EXCLUDED | ItemFlag.PATTERN_OR_PLAN, 0, rng.choice(flags)]),
+            )
+            dataset = self.ledger.query(query)
+
+            assert dict(dataset) == self.brute_force(query), query
+            assert [count for _, count in dataset] == sorted((count for _, count in dataset), reverse=True)
+
+    def test_query_matches_main_spec_received(self):
+        for since, until in [(None, None), ("20210701", None), ("20210801", "20210930"), ("20211001", "20210901")]:
+            Config.date_filter, Config.date_until = since, until
+            for team, members in self.ledger.teams.items():
+                expected = {member.name: len(member.main_spec_received) for member in members}
+
+                assert dict(self.ledger.query(LootQuery.from_config(team))) == expected
+                assert dict(self.ledger.get_main_spec_dataset(team)) == expected
+
+    def test_totals_since_matches_datasets(self):
+        cutoffs = ["20200101", self.dates[0], self.dates[len(self.dates) // 2], self.dates[-1], "20300101"]
+        for until in (None, self.dates[len(self.dates) // 3]):
+            Config.date_until = until
+            for team in self.ledger.teams:
+                totals = self.ledger.totals_since(team, cutoffs)
+                for cutoff in cutoffs:
+                    Config.date_filter = cutoff
+
+                    assert totals.dataset(cutoff) == self.ledger.get_main_spec_dataset(team), (team, cutoff, until)
+                Config.date_filter = None
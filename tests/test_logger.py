@@ -0,0 +1,32 @@
+import io
+from unittest import TestCase, mock
+
+from rich.console import Console
+
+import logger.file_logger as file_logger
+from config import Config
+from ledger import Ledger
+from tests.history import history, team_a
+
+
+class TerminalLoggerTest(TestCase):
+    def setUp(self):
+        self.style_choice = Config.style_choice
+        Config.style_choice = "default"
+        self.ledger = Ledger(history())
+
+    def tearDown(self):
+        Config.style_choice = self.style_choice
+
+    def log(self, **console) -> str:
+        output = io.StringIO()
+        with mock.patch.object(file_logger, "Console", lambda: Console(file=output, width=100, **console)):
+            with mock.patch("builtins.print"):
+                file_logger.TerminalLogger.log_main_spec(self.ledger, team_a)
+        return output.getvalue()
+
+    def test_single_table_when_not_a_terminal(self):
+        assert self.log(height=7).count("Player Name") == 1
+
+    def test_pages_fit_the_terminal(self):
+        assert self.log(height=7, force_terminal=True).count("Player Name") == 3
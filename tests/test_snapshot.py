@@ -0,0 +1,104 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+import snapshot
+from config import Config
+from ledger import Ledger
+from tests.history import history, item, team_a
+
+
+class SnapshotTest(TestCase):
+    def setUp(self):
+        self.config = {key: getattr(Config, key) for key in ("style_choice", "excluded_officer_note")}
+        Config.style_choice = "default"
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.export = os.path.join(self.directory.name, "character-json.json")
+        self.cache_dir = os.path.join(self.directory.name, "cache")
+        self.snapshot_dir = os.path.join(self.cache_dir, "ledger")
+        self.write_export(history())
+
+    def tearDown(self):
+        for key, value in self.config.items():
+            setattr(Config, key, value)
+        self.directory.cleanup()
+
+    def write_export(self, export: list):
+        with open(self.export, "w") as fp:
+            json.dump(export, fp)
+
+    def load(self) -> Ledger:
+        return Ledger(snapshot.load_history(self.export, self.cache_dir))
+
+    @staticmethod
+    def summary(ledger: Ledger) -> dict:
+        return {
+            team: {
+                "dataset": ledger.get_main_spec_dataset(team),
+                "listing": ledger.loot_listing(team),
+                "players": [
+                    (member.id, member.name, member.role, [
+                        (item.item_id, item.item_name, item.officer_note, item.received_at, item.instance_id,
+                         item.flags)
+                        for item in member.received
+                    ])
+                    for member in members
+                ],
+            }
+            for team, members in sorted(ledger.teams.items())
+        }
+
+    def test_round_trip(self):
+        parsed = self.load()
+        loaded = self.load()
+
+        assert isinstance(loaded.history.items.item_id, np.memmap)
+        assert not isinstance(parsed.history.items.item_id, np.memmap)
+        assert self.summary(loaded) == self.summary(parsed) == self.summary(Ledger(history()))
+
+    def test_changed_export_is_reparsed(self):
+        self.load()
+        export = history()
+        export[0]["received"].append(item(106, "New Helm", "2021-08-24 20:00:00"))
+        self.write_export(export)
+
+        ledger = self.load()
+        assert not isinstance(ledger.history.items.item_id, np.memmap)
+        assert self.summary(ledger) == self.summary(Ledger(export))
+        assert isinstance(self.load().history.items.item_id, np.memmap)
+
+    def test_changed_exclusions_are_reparsed(self):
+        before = dict(self.load().get_main_spec_dataset(team_a))
+        Config.excluded_officer_note = ()
+
+        ledger = self.load()
+        assert not isinstance(ledger.history.items.item_id, np.memmap)
+        assert dict(ledger.get_main_spec_dataset(team_a)) == {"Alpha": 2, "Bravo": 3}
+        assert before == {"Alpha": 1, "Bravo": 2}
+
+    def test_missing_snapshot(self):
+        assert snapshot.load(snapshot.fingerprint(self.export), self.snapshot_dir) is None
+
+    def test_corrupt_snapshot(self):
+        self.load()
+        key = snapshot.fingerprint(self.export)
+        assert snapshot.load(key, self.snapshot_dir) is not None
+
+        column = os.path.join(self.snapshot_dir, "item_id.npy")
+        with open(column, "r+b") as fp:
+            fp.truncate(20)
+        assert snapshot.load(key, self.snapshot_dir) is None
+
+        os.remove(column)
+        assert snapshot.load(key, self.snapshot_dir) is None
+
+        with open(os.path.join(self.snapshot_dir, "manifest.json"), "w") as manifest:
+            manifest.write("{not json")
+        assert snapshot.load(key, self.snapshot_dir) is None
+
+        assert self.summary(self.load()) == self.summary(Ledger(history()))
+        assert isinstance(self.load().history.items.item_id, np.memmap)
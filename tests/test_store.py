@@ -0,0 +1,81 @@
+import datetime
+from unittest import TestCase
+
+import numpy as np
+
+from ledger import ReceivedItem
+from store import NO_DATE, ItemStore, to_ordinal, from_ordinal
+from tests.history import item
+
+
+class ToOrdinalTest(TestCase):
+    def test_formats(self):
+        ordinal = datetime.date(2021, 8, 15).toordinal()
+
+        assert to_ordinal("20210815") == ordinal
+        assert to_ordinal("2021-08-15") == ordinal
+        assert to_ordinal("2021-08-15 20:31:07") == ordinal
+        assert from_ordinal(ordinal) == "2021-08-15"
+
+    def test_empty(self):
+        assert to_ordinal(None) == NO_DATE
+        assert to_ordinal("") == NO_DATE
+
+    def test_rejects_partial_dates(self):
+        for date in ("20", "2108", "202108", "2021081", "2021-08", "abcdefgh"):
+            with self.assertRaises(ValueError):
+                to_ordinal(date)
+
+    def test_rejects_invalid_dates(self):
+        for date in ("20211301", "20210230", "20210800"):
+            with self.assertRaises(ValueError):
+                to_ordinal(date)
+
+
+class ItemStoreTest(TestCase):
+    @staticmethod
+    def items(player_index: int, *dates) -> list:
+        return [(player_index, ReceivedItem.parse(item(len(date), f"Item {date}", date))) for date in dates]
+
+    def test_rows_of(self):
+        store = ItemStore.from_items([*self.items(0, "2021-08-03"), *self.items(2, "2021-08-03", "2021-08-10")])
+
+        assert store.rows_of(0) == slice(0, 1)
+        assert store.rows_of(1) == slice(1, 1)
+        assert store.rows_of(2) == slice(1, 3)
+        assert store.rows_of(3) == slice(3, 3)
+
+    def test_repeated_extends(self):
+        store = ItemStore.from_items(self.items(0, "2021-08-10", "2021-08-17"))
+        expected = {0: ["2021-08-10", "2021-08-17"], 1: []}
+
+        for week in range(1, 200):
+            date = str(datetime.date(2021, 8, 1) + datetime.timedelta(days=week % 30))
+            store.extend([*self.items(0, date), *self.items(1, date)])
+            expected[0].append(date)
+            expected[1].append(date)
+
+        assert len(store) == 2 + 2 * 199
+        assert all(len(getattr(store, column)) == len(store) for column in ItemStore.columns)
+        for index, dates in expected.items():
+            rows = store.player_rows(index)
+            assert [store.timestamps[code] for code in store.timestamp[rows].tolist()] == sorted(dates)
+
+    def test_extend_reuses_capacity(self):
+        store = ItemStore.from_items(self.items(0, "2021-08-10"))
+        store.extend(self.items(1, "2021-08-11"))
+        buffer = store.player
+
+        store.extend(self.items(1, "2021-08-12"))
+        assert np.shares_memory(buffer, store.player)
+        assert store.player.tolist() == [0, 1, 1]
+
+    def test_in_player_order(self):
+        store = ItemStore.from_items(self.items(0, "2021-08-10"))
+        store.extend([*self.items(1, "2021-08-03"), *self.items(0, "2021-08-03")])
+        ordered = store.in_player_order()
+
+        assert ordered.ordered_rows is None
+        assert ordered.player.tolist() == [0, 0, 1]
+        assert ordered.player_rows(0) == slice(0, 2)
+        assert ordered.received.tolist() == sorted(ordered.received[:2].tolist()) + ordered.received[2:].tolist()